@@ -0,0 +1,83 @@
+# Benchmark do acerto de contas: saldos mantidos a cada conta e transferências com milhares de integrantes
+#
+# Mede a vazão da atualização incremental dos saldos (inclusões e exclusões, como o diário faz), o
+# tempo de liquidos() + transferencias() para todo o histórico e para um mês, e compara a quantidade
+# de transferências do guloso com o limite n - 1 e com o acerto ingênuo (cada devedor paga a cada
+# credor a sua parte).
+#
+# Uso: python benchmark/acerto.py [quantidade_de_contas] [--integrantes N] [--semente S]
+import argparse  # Para ler os argumentos da linha de comando
+import os  # Para localizar a pasta raiz do projeto
+import sys  # Para permitir importar o pacote casasplit
+import time  # Para medir o tempo de cada etapa
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))  # Permite importar o pacote da raiz do projeto
+from casasplit.acerto import Saldos, transferencias
+from casasplit.livro import Lancamento
+from gerador import gerar_lancamentos, nome_integrante
+
+PARTE_EXCLUIDA = 10  # Uma a cada PARTE_EXCLUIDA contas é excluída depois de incluída
+
+
+# Função para medir o melhor tempo de algumas repetições (e devolver o último resultado)
+def medir(funcao, repeticoes=3):
+    melhor = float('inf')
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        resultado = funcao()
+        melhor = min(melhor, time.perf_counter() - inicio)
+    return melhor, resultado
+
+
+# Função para conferir que as transferências zeram todos os saldos
+def conferir(liquidos, lista):
+    restante = dict(liquidos)
+    for devedor, credor, centavos in lista:
+        restante[devedor] += centavos
+        restante[credor] -= centavos
+    if any(restante.values()):
+        raise AssertionError("as transferências não zeram os saldos")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mede o acerto de contas com muitos integrantes e contas.")
+    parser.add_argument('contas', type=int, nargs='?', default=1_000_000, help="quantidade de contas (padrão: 1000000)")
+    parser.add_argument('--integrantes', type=int, default=2_000, help="quantidade de integrantes (padrão: 2000)")
+    parser.add_argument('--semente', type=int, default=42, help="semente do gerador (padrão: 42)")
+    argumentos = parser.parse_args()
+
+    lancamentos = [Lancamento(*campos) for campos in gerar_lancamentos(argumentos.contas, argumentos.semente, integrantes=argumentos.integrantes)]
+    excluidos = lancamentos[::PARTE_EXCLUIDA]
+    integrantes = [nome_integrante(numero) for numero in range(1, argumentos.integrantes + 1)]
+    print(f"{argumentos.contas} contas, {argumentos.integrantes} integrantes")
+
+    saldos = Saldos()
+    inicio = time.perf_counter()
+    for lancamento in lancamentos:
+        saldos.adicionar(lancamento)
+    segundos = time.perf_counter() - inicio
+    print(f"{'inclusões':<28} {segundos * 1000:10.1f} ms  {len(lancamentos) / segundos:14,.0f} contas/s")
+
+    inicio = time.perf_counter()
+    for lancamento in excluidos:
+        saldos.remover(lancamento)
+    segundos = time.perf_counter() - inicio
+    print(f"{'exclusões':<28} {segundos * 1000:10.1f} ms  {len(excluidos) / segundos:14,.0f} contas/s")
+
+    meses = sorted(saldos.pago_mes)
+    for nome, mes in (('todos os meses', None), (f"mês {meses[-1]}", meses[-1])):
+        liquidos = saldos.liquidos(integrantes, mes)
+        segundos_liquidos, _ = medir(lambda: saldos.liquidos(integrantes, mes))
+        segundos_transferencias, lista = medir(lambda: transferencias(liquidos))
+        conferir(liquidos, lista)
+
+        credores = sum(1 for saldo in liquidos.values() if saldo > 0)
+        ingenuo = credores * (len(liquidos) - credores)  # Cada devedor paga a cada credor
+        print(
+            f"{nome:<28} liquidos {segundos_liquidos * 1000:8.1f} ms  transferencias {segundos_transferencias * 1000:8.1f} ms  "
+            f"{len(lista)} transferências (limite n - 1: {max(len(liquidos) - 1, 0)}, ingênuo: {ingenuo})"
+        )
+
+
+if __name__ == "__main__":
+    main()
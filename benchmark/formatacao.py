@@ -0,0 +1,46 @@
+# Benchmark da formatação em reais: locale.currency linha a linha x formatar_brl_vetor
+#
+# Uso: python benchmark/formatacao.py [quantidade_de_valores]
+import locale  # Caminho antigo: formatação pelo locale do sistema
+import os  # Para localizar a pasta raiz do projeto
+import sys  # Para ler os argumentos e permitir importar o pacote casasplit
+import time  # Para medir o tempo de cada caminho
+
+import numpy as np  # Para gerar os valores de teste
+import pandas as pd  # A coluna Valor do dashboard é uma Series
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))  # Permite importar o pacote da raiz do projeto
+from casasplit.formatacao import formatar_brl, formatar_brl_vetor
+
+
+# Função para medir o melhor tempo de algumas repetições
+def medir(funcao, repeticoes=3):
+    melhor = float('inf')
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao()
+        melhor = min(melhor, time.perf_counter() - inicio)
+    return melhor
+
+
+def main():
+    quantidade = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    valores = pd.Series(np.random.default_rng(42).uniform(0, 5000, quantidade).round(2))
+
+    caminhos = {}
+    try:
+        locale.setlocale(locale.LC_ALL, 'pt_BR.UTF-8')
+        caminhos['locale.currency (apply)'] = lambda: valores.apply(lambda v: locale.currency(v, grouping=True))
+    except locale.Error:
+        print("Locale pt_BR.UTF-8 não disponível nesta máquina; o caminho com locale.currency foi ignorado.")
+    caminhos['formatar_brl (apply)'] = lambda: valores.apply(formatar_brl)
+    caminhos['formatar_brl_vetor'] = lambda: formatar_brl_vetor(valores)
+
+    print(f"{quantidade} valores")
+    for nome, funcao in caminhos.items():
+        segundos = medir(funcao)
+        print(f"{nome:<26} {segundos * 1000:10.1f} ms  {quantidade / segundos:14,.0f} valores/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+# Gerador de dados sintéticos para os benchmarks: diário de contas e lista de integrantes
+#
+# Com a mesma semente, os mesmos arquivos são gerados byte a byte. As contas usam os tipos do
+# cadastro do contas.py, meses espalhados por vários anos, valores entre R$ 5 e R$ 2.000 e um dos
+# integrantes gerados como pagador.
+#
+# Uso:
+#   python benchmark/gerador.py 1000000                     (grava contas.diario.csv e integrantes.csv na pasta atual)
+#   python benchmark/gerador.py 10000 --integrantes 8 --semente 7 --pasta /tmp/casa
+import argparse  # Para ler os argumentos da linha de comando
+import csv  # Para gravar os arquivos no mesmo formato usado pelo app
+import os  # Para montar os caminhos
+import random  # Gerador com semente (reprodutível)
+import sys  # Para permitir importar o pacote casasplit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))  # Permite importar o pacote da raiz do projeto
+from casasplit.categorias import TIPOS_CONTA
+from casasplit.livro import ARQUIVO_DIARIO, OP_INSERIR, cabecalho_diario, novo_id
+
+ANO_INICIAL = 2015  # Primeiro ano dos meses gerados
+ANO_FINAL = 2025  # Último ano dos meses gerados
+LINHAS_POR_BLOCO = 100_000  # Linhas montadas em memória antes de cada escrita
+
+
+# Função para obter o nome do integrante gerado com o número informado (a partir de 1)
+def nome_integrante(numero):
+    return f"Integrante {numero:03d}"
+
+
+# Função para gerar as contas (id, data, conta, valor, pagador) com a semente informada
+def gerar_lancamentos(quantidade, semente=42, anos=(ANO_INICIAL, ANO_FINAL), tipos=TIPOS_CONTA, integrantes=4):
+    aleatorio = random.Random(semente)
+    meses = [f"{ano}-{mes:02d}" for ano in range(anos[0], anos[1] + 1) for mes in range(1, 13)]
+    pesos = [1 / (posicao + 1) for posicao in range(len(tipos))]  # Poucas contas muito comuns, muitas raras
+    for _ in range(quantidade):
+        yield (
+            f"{aleatorio.getrandbits(64):016x}",  # Mesmo formato dos ids de novo_id()
+            aleatorio.choice(meses),
+            aleatorio.choices(tipos, pesos)[0],
+            round(aleatorio.uniform(5, 2000), 2),
+            nome_integrante(aleatorio.randint(1, integrantes)),
+        )
+
+
+# Função para gravar um diário com a quantidade de contas pedida
+def gerar_diario(caminho, quantidade, semente=42, integrantes=4):
+    with open(caminho, 'w', newline='', encoding='utf-8') as arquivo:
+        escritor = csv.writer(arquivo)
+        escritor.writerow(cabecalho_diario(novo_id()))
+        bloco = []
+        for id_conta, data, conta, valor, pagador in gerar_lancamentos(quantidade, semente, integrantes=integrantes):
+            bloco.append((id_conta, OP_INSERIR, data, conta, valor, pagador, ''))  # Dividida por todos
+            if len(bloco) == LINHAS_POR_BLOCO:
+                escritor.writerows(bloco)
+                bloco = []
+        escritor.writerows(bloco)
+
+
+# Função para gravar o integrantes.csv com a quantidade de integrantes pedida
+def gerar_integrantes(caminho, quantidade):
+    with open(caminho, 'w', newline='', encoding='utf-8') as arquivo:
+        escritor = csv.writer(arquivo)
+        escritor.writerow(['Integrantes'])
+        escritor.writerows([nome_integrante(numero)] for numero in range(1, quantidade + 1))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Gera um diário de contas e um integrantes.csv sintéticos.")
+    parser.add_argument('linhas', type=int, help="quantidade de contas no diário (por exemplo, 1000 a 10000000)")
+    parser.add_argument('--integrantes', type=int, default=4, help="quantidade de integrantes (padrão: 4)")
+    parser.add_argument('--semente', type=int, default=42, help="semente do gerador (padrão: 42)")
+    parser.add_argument('--pasta', default='.', help="pasta onde os arquivos são gravados (padrão: a atual)")
+    argumentos = parser.parse_args()
+
+    os.makedirs(argumentos.pasta, exist_ok=True)
+    gerar_diario(os.path.join(argumentos.pasta, ARQUIVO_DIARIO), argumentos.linhas, argumentos.semente, argumentos.integrantes)
+    gerar_integrantes(os.path.join(argumentos.pasta, 'integrantes.csv'), argumentos.integrantes)
+    print(f"{argumentos.linhas} contas e {argumentos.integrantes} integrantes gravados em '{argumentos.pasta}'.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+# Benchmark de inicialização a frio: tempo até a primeira janela do contas.py e do integrantes.py
+#
+# Cada execução abre o app num processo novo, numa pasta temporária com cópias de contas.csv e
+# integrantes.csv, com CASASPLIT_MEDIR_INICIO ligada: o app escreve um marcador quando a janela
+# aparece e fecha sozinho. O tempo medido vai do início do processo até o marcador.
+#
+# Uso:
+#   python benchmark/inicio_frio.py                      (scripts, com o Python atual)
+#   python benchmark/inicio_frio.py --exe dist/contas.exe --exe dist/integrantes.exe   (builds do PyInstaller)
+#   python benchmark/inicio_frio.py --repeticoes 10
+import argparse  # Para ler os argumentos da linha de comando
+import os  # Para montar o ambiente dos processos
+import shutil  # Para copiar os arquivos de dados
+import statistics  # Para mediana e desvio
+import subprocess  # Para abrir cada app num processo novo
+import sys  # Para saber qual Python usar
+import tempfile  # Pasta temporária para não mexer nos dados reais
+import time  # Para medir o tempo
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))  # Pasta raiz do projeto
+sys.path.insert(0, RAIZ)  # Permite importar o pacote da raiz do projeto
+from casasplit.inicio import MARCADOR, VARIAVEL
+
+SCRIPTS = {
+    'contas.py': os.path.join(RAIZ, 'contas', 'contas.py'),
+    'integrantes.py': os.path.join(RAIZ, 'integrantes', 'integrantes.py'),
+}
+ARQUIVOS_DADOS = ['contas.csv', 'integrantes.csv']  # Copiados para a pasta temporária
+LIMITE_SEGUNDOS = 60  # Desiste de uma execução que não mostrar a janela nesse tempo
+
+
+# Função para medir uma execução: segundos até o marcador aparecer na saída do app
+def medir(comando, pasta):
+    ambiente = dict(os.environ, **{VARIAVEL: '1'})
+    inicio = time.perf_counter()
+    processo = subprocess.Popen(comando, cwd=pasta, env=ambiente, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+    try:
+        for linha in processo.stdout:
+            if linha.strip() == MARCADOR:
+                return time.perf_counter() - inicio
+            if time.perf_counter() - inicio > LIMITE_SEGUNDOS:
+                break
+        raise RuntimeError(f"O app não mostrou a janela: {' '.join(comando)}")
+    finally:
+        processo.stdout.close()
+        try:
+            processo.wait(timeout=LIMITE_SEGUNDOS)  # O app fecha sozinho depois do marcador
+        except subprocess.TimeoutExpired:
+            processo.kill()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tempo até a primeira janela dos apps do CasaSplit.")
+    parser.add_argument('--exe', action='append', default=[], help="Executável do PyInstaller para medir (pode repetir)")
+    parser.add_argument('--repeticoes', type=int, default=5, help="Execuções por app (padrão: 5)")
+    argumentos = parser.parse_args()
+
+    if argumentos.exe:
+        alvos = {os.path.basename(exe): [os.path.abspath(exe)] for exe in argumentos.exe}
+    else:
+        alvos = {nome: [sys.executable, caminho] for nome, caminho in SCRIPTS.items()}
+
+    with tempfile.TemporaryDirectory() as pasta:
+        for nome in ARQUIVOS_DADOS:
+            if os.path.exists(os.path.join(RAIZ, nome)):
+                shutil.copy(os.path.join(RAIZ, nome), pasta)
+
+        print(f"{'app':<20} {'mediana':>10} {'mínimo':>10} {'máximo':>10}")
+        for nome, comando in alvos.items():
+            medir(comando, pasta)  # Primeira execução só aquece o cache de disco do sistema
+            tempos = [medir(comando, pasta) for _ in range(argumentos.repeticoes)]
+            print(f"{nome:<20} {statistics.median(tempos) * 1000:8.0f}ms {min(tempos) * 1000:8.0f}ms {max(tempos) * 1000:8.0f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,323 @@
+# Suíte de benchmarks dos caminhos críticos do contas.py e da dashboard, sem abrir janela nem servidor
+#
+# Para cada tamanho pedido, um diário sintético (benchmark/gerador.py) é gravado numa pasta temporária
+# e cada etapa é medida: o melhor tempo de algumas repetições dá a vazão, e uma execução extra com o
+# tracemalloc dá o pico de memória alocada. O tkinter e o streamlit são trocados por módulos falsos:
+# os widgets guardam só o texto, as caixas de mensagem confirmam tudo, as tarefas do ExecutorTk rodam
+# na hora e a dashboard roda o script inteiro com os elementos da página ignorados.
+#
+# Com --base, os resultados são comparados com os gravados antes por --salvar-base, e a suíte termina
+# com erro se alguma etapa ficar mais lenta (ou usar mais memória) do que a base mais o --limite.
+#
+# Uso:
+#   python benchmark/suite.py                                   (1.000, 10.000 e 100.000 contas)
+#   python benchmark/suite.py --linhas 1000 10000000 --repeticoes 1
+#   python benchmark/suite.py --salvar-base benchmark/base.json
+#   python benchmark/suite.py --base benchmark/base.json --limite 0.25
+import argparse  # Para ler os argumentos da linha de comando
+import json  # Para gravar e ler a base de comparação
+import os  # Para montar os caminhos e trocar de pasta
+import runpy  # Para executar o script da dashboard como o streamlit faz
+import sys  # Para trocar o tkinter e o streamlit por módulos falsos
+import tempfile  # Pasta temporária para não mexer nos dados reais
+import time  # Para medir o tempo
+import tracemalloc  # Para medir o pico de memória alocada
+import types  # Para montar os módulos falsos
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))  # Pasta raiz do projeto
+sys.path.insert(0, RAIZ)  # Permite importar o pacote da raiz do projeto
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))  # Permite importar o gerador
+from gerador import gerar_diario, gerar_integrantes, nome_integrante
+
+from casasplit import graficos
+from casasplit import livro as modulo_livro
+from casasplit.livro import ARQUIVO_DIARIO
+
+SCRIPT_DASHBOARD = os.path.join(RAIZ, 'dashboard', 'dashboard.py')
+LINHAS_PADRAO = [1_000, 10_000, 100_000]
+INTEGRANTES = 4  # Integrantes do integrantes.csv sintético
+OPERACOES = 100  # Inclusões e exclusões medidas por repetição (cada uma grava no disco)
+CONSULTAS = 1_000  # Cálculos do preço por integrante (e acertos de contas) medidos por repetição
+LIMITE_PADRAO = 0.25  # Regressão tolerada em relação à base (25%)
+
+
+class Falso:
+    # Aceita qualquer atributo, chamada ou bloco with e não faz nada
+    def __getattr__(self, nome):
+        return self
+
+    def __call__(self, *args, **kwargs):
+        return self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *erro):
+        return False
+
+
+class CaixaMensagens(Falso):
+    # Substitui o tkinter.messagebox: guarda as mensagens e confirma todas as perguntas
+    def __init__(self):
+        self.mensagens = []
+
+    def showinfo(self, titulo, texto):
+        self.mensagens.append(('info', titulo, texto))
+
+    def showerror(self, titulo, texto):
+        self.mensagens.append(('erro', titulo, texto))
+
+    def askyesno(self, titulo, texto):
+        return True
+
+
+class Campo(Falso):
+    # Substitui Combobox e Entry: só guarda o texto
+    def __init__(self, texto=''):
+        self.texto = texto
+
+    def get(self):
+        return self.texto
+
+    def set(self, texto):
+        self.texto = texto
+
+    def delete(self, inicio, fim=None):
+        self.texto = ''
+
+
+class TabelaFalsa(Falso):
+    # Substitui a TabelaVirtual: a cada atualização formata as linhas que estariam visíveis
+    def __init__(self, modelo, formatar_linha, visiveis=30):
+        self.modelo = modelo
+        self.formatar_linha = formatar_linha
+        self.visiveis = visiveis
+        self.selecao = None
+        self.linhas = []
+
+    def reiniciar(self):
+        self.atualizar()
+
+    def atualizar(self):
+        self.linhas = [self.formatar_linha(i) for i in self.modelo.fatia(0, self.visiveis)]
+
+    def selecionado(self):
+        return self.selecao
+
+
+class ExecutorSincrono:
+    # Substitui o ExecutorTk: executa a tarefa na hora e chama o callback em seguida
+    def executar(self, funcao, *args, ao_concluir=None, ao_falhar=None, chave=None):
+        resultado = funcao(*args)  # Um erro interrompe a suíte em vez de virar caixa de mensagem
+        if ao_concluir:
+            ao_concluir(resultado)
+
+
+class StreamlitFalso(Falso):
+    # Substitui o streamlit: caches viram chamadas diretas e os elementos da página são ignorados
+    def __init__(self):
+        self.sidebar = self
+        self.session_state = {}
+
+    def cache_resource(self, funcao=None, **opcoes):
+        return funcao if funcao else (lambda f: f)
+
+    cache_data = cache_resource
+
+    def selectbox(self, rotulo, opcoes, index=0, **opcoes_extras):
+        return opcoes[index]
+
+    def toggle(self, rotulo, value=False, **opcoes):
+        return value
+
+    checkbox = toggle
+
+    def columns(self, quantidade, **opcoes):
+        return [self] * (quantidade if isinstance(quantidade, int) else len(quantidade))
+
+
+# Função para trocar o tkinter e o streamlit pelos módulos falsos; retorna a caixa de mensagens
+def instalar_falsos():
+    caixa = CaixaMensagens()
+    tkinter = types.ModuleType('tkinter')
+    tkinter.__getattr__ = lambda nome: Falso()
+    tkinter.messagebox = caixa
+    tkinter.ttk = Falso()
+    tkinter.END = 'end'
+    sys.modules.update({'tkinter': tkinter, 'tkinter.messagebox': caixa, 'tkinter.ttk': tkinter.ttk})
+    sys.modules['streamlit'] = StreamlitFalso()
+    return caixa
+
+
+# Função para importar o contas.py e ligar seus widgets aos falsos
+def preparar_contas():
+    sys.path.insert(0, os.path.join(RAIZ, 'contas'))
+    import contas
+
+    contas.executor = ExecutorSincrono()
+    contas.mes_combobox = Campo('01')
+    contas.ano_combobox = Campo('2025')
+    contas.conta_combobox = Campo()
+    contas.entrada_valor = Campo()
+    contas.pagador_combobox = Campo()
+    contas.label_integrantes = Falso()
+    contas.tabela = TabelaFalsa(contas.visao, contas.formatar_linha)
+    return contas
+
+
+# Função para medir o melhor tempo de algumas repetições e o pico de memória de uma execução extra
+def medir(funcao, repeticoes):
+    melhor = float('inf')
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao()
+        melhor = min(melhor, time.perf_counter() - inicio)
+
+    tracemalloc.start()
+    try:
+        funcao()
+        _, pico = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return melhor, pico
+
+
+# Função para medir todas as etapas com um diário de 'linhas' contas; retorna {etapa: (segundos, unidades, pico)}
+def medir_etapas(contas, caixa, linhas, repeticoes):
+    resultados = {}
+
+    def registrar(etapa, funcao, unidades):
+        segundos, pico = medir(funcao, repeticoes)
+        resultados[etapa] = (segundos, unidades, pico)
+        erros = [mensagem for mensagem in caixa.mensagens if mensagem[0] == 'erro']
+        if erros:
+            raise RuntimeError(f"{etapa}: {erros[0][2]}")
+        caixa.mensagens.clear()
+
+    # Leitura do diário do zero (primeira abertura do app)
+    def abrir():
+        modulo_livro._livros.clear()
+        modulo_livro.abrir_livro()
+    registrar('abrir_livro', abrir, linhas)
+
+    # Releitura e montagem dos índices ordenados da tabela
+    registrar('atualizar_tabela', contas.atualizar_tabela, linhas)
+
+    # Clique no cabeçalho: troca o índice exibido
+    def ordenar():
+        for coluna in ('Data', 'Conta', 'Valor'):
+            contas.atualizar_tabela(coluna)
+    registrar('ordenar_coluna', ordenar, 3)
+
+    def salvar():
+        for numero in range(OPERACOES):
+            contas.conta_combobox.set('Energia')
+            contas.pagador_combobox.set(nome_integrante(numero % INTEGRANTES + 1))
+            contas.entrada_valor.set(f"{numero + 1}.50")
+            contas.salvar_contas()
+    registrar('salvar_contas', salvar, OPERACOES)
+
+    def excluir():
+        for id_conta in contas.visao.fatia(0, OPERACOES):
+            contas.tabela.selecao = id_conta
+            contas.excluir_linha()
+        modulo_livro.abrir_livro().aguardar_compactacao()
+    registrar('excluir_linha', excluir, OPERACOES)
+
+    def calcular():
+        for _ in range(CONSULTAS):
+            contas.calcular_preco_por_integrante()
+    registrar('calcular_preco_por_integrante', calcular, CONSULTAS)
+
+    def acertar():
+        for _ in range(CONSULTAS):
+            contas.mostrar_acerto()
+    registrar('acerto_de_contas', acertar, CONSULTAS)
+
+    # Dashboard: o script inteiro, e depois só a montagem do DataFrame e os agrupamentos
+    espaco = {}
+    def dashboard():
+        graficos._cache.clear()  # Desenha os gráficos de novo a cada execução
+        espaco.update(runpy.run_path(SCRIPT_DASHBOARD, run_name='dashboard'))
+    registrar('dashboard', dashboard, linhas)
+
+    livro = modulo_livro.abrir_livro()
+    dados = {}
+    def carregar_dados():
+        dados['df'] = espaco['carregar_dados'](livro, livro.versao)
+    registrar('carregar_dados', carregar_dados, linhas)
+
+    def agrupar():
+        df = dados['df']
+        df.groupby('Data')['Valor'].sum()
+        df.groupby('Conta')['Valor'].sum()
+        df[df['Data'] == df['Data'].iloc[-1]]
+    registrar('groupby', agrupar, linhas)
+
+    return resultados
+
+
+# Função para comparar os resultados com a base; retorna a lista de regressões encontradas
+def comparar(resultados, base, limite):
+    regressoes = []
+    for chave, (segundos, _, pico) in resultados.items():
+        anterior = base.get(chave)
+        if anterior is None:
+            continue
+        if segundos > anterior['segundos'] * (1 + limite):
+            regressoes.append(f"{chave}: {anterior['segundos'] * 1000:.1f} ms -> {segundos * 1000:.1f} ms")
+        if pico > anterior['pico_bytes'] * (1 + limite):
+            regressoes.append(f"{chave}: pico {anterior['pico_bytes'] / 2**20:.1f} MB -> {pico / 2**20:.1f} MB")
+    return regressoes
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mede os caminhos críticos do contas.py e da dashboard com dados sintéticos.")
+    parser.add_argument('--linhas', type=int, nargs='+', default=LINHAS_PADRAO, help="tamanhos do diário (padrão: 1000 10000 100000)")
+    parser.add_argument('--repeticoes', type=int, default=3, help="repetições de cada etapa; vale o melhor tempo (padrão: 3)")
+    parser.add_argument('--semente', type=int, default=42, help="semente do gerador (padrão: 42)")
+    parser.add_argument('--base', help="arquivo JSON com os resultados de referência")
+    parser.add_argument('--limite', type=float, default=LIMITE_PADRAO, help="regressão tolerada em relação à base (padrão: 0.25 = 25%%)")
+    parser.add_argument('--salvar-base', metavar='ARQUIVO', help="grava os resultados desta execução como base")
+    argumentos = parser.parse_args()
+
+    caixa = instalar_falsos()
+    contas = preparar_contas()
+    pasta_original = os.getcwd()
+    resultados = {}
+
+    print(f"{'etapa':<32}{'linhas':>12}{'tempo':>14}{'vazão':>20}{'pico':>12}")
+    for linhas in argumentos.linhas:
+        with tempfile.TemporaryDirectory() as pasta:
+            os.chdir(pasta)  # O app e a dashboard leem os arquivos da pasta atual
+            try:
+                gerar_diario(ARQUIVO_DIARIO, linhas, argumentos.semente, INTEGRANTES)
+                gerar_integrantes('integrantes.csv', INTEGRANTES)
+                etapas = medir_etapas(contas, caixa, linhas, argumentos.repeticoes)
+                modulo_livro.abrir_livro().aguardar_compactacao()
+                modulo_livro._livros.clear()
+            finally:
+                os.chdir(pasta_original)
+
+        for etapa, (segundos, unidades, pico) in etapas.items():
+            resultados[f"{etapa}@{linhas}"] = (segundos, unidades, pico)
+            print(f"{etapa:<32}{linhas:>12}{segundos * 1000:>11.1f} ms{unidades / segundos:>16,.0f} /s{pico / 2**20:>9.1f} MB")
+
+    if argumentos.salvar_base:
+        with open(argumentos.salvar_base, 'w', encoding='utf-8') as arquivo:
+            json.dump({chave: {'segundos': s, 'pico_bytes': p} for chave, (s, _, p) in resultados.items()}, arquivo, indent=2)
+        print(f"Base gravada em '{argumentos.salvar_base}'.")
+
+    if argumentos.base:
+        with open(argumentos.base, encoding='utf-8') as arquivo:
+            regressoes = comparar(resultados, json.load(arquivo), argumentos.limite)
+        if regressoes:
+            print(f"Regressões acima de {argumentos.limite:.0%}:")
+            for regressao in regressoes:
+                print(f"  {regressao}")
+            sys.exit(1)
+        print(f"Nenhuma regressão acima de {argumentos.limite:.0%} em relação a '{argumentos.base}'.")
+
+
+if __name__ == "__main__":
+    main()
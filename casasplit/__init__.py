@@ -0,0 +1 @@
+# Pacote com o código compartilhado entre contas.py, integrantes.py e dashboard.py
@@ -0,0 +1,105 @@
+# Acerto de contas: quem deve pagar quanto para quem
+#
+# Saldos guarda quanto cada pessoa pagou (em centavos) e o total de cada grupo de participantes, no
+# geral e por mês, e é atualizado a cada inclusão ou exclusão do diário, como o índice de agregados.
+# Na hora do acerto, o total de cada grupo é dividido entre os seus participantes (todos os
+# integrantes quando a conta não tem Participantes) na proporção dos pesos, com as mesmas regras do
+# casasplit.divisao; os centavos que sobram vão para as maiores frações, então os saldos somam zero.
+# O saldo líquido de cada um é o que pagou menos a sua parte. transferencias() liquida os saldos com
+# um guloso sobre dois heaps: o maior devedor paga o maior credor, e quem ainda tiver saldo volta ao
+# heap. Cada passo zera pelo menos uma pessoa, então são no máximo n - 1 transferências (em vez de
+# uma para cada par devedor × credor), em O(n log n).
+# Contas sem pagador (por exemplo, as gravadas antes da coluna Pagador existir) ficam fora do acerto.
+import heapq  # Heaps de devedores e credores
+from collections import Counter  # Total pago por pessoa
+
+from casasplit.agregados import mes_da_data, para_centavos
+
+SEPARADOR_PARTICIPANTES = ';'  # Separa os nomes na coluna Participantes
+
+
+class Saldos:
+    # Total pago por pessoa e total das contas com pagador, no geral e por mês (em centavos)
+    def __init__(self):
+        self.pago = Counter()  # pessoa -> centavos pagos
+        self.total = 0  # Centavos das contas com pagador
+        self.total_grupo = Counter()  # participantes -> centavos das contas com pagador
+        self.pago_mes = {}  # mês -> Counter(pessoa -> centavos)
+        self.total_mes = Counter()  # mês -> centavos
+        self.total_mes_grupo = {}  # mês -> Counter(participantes -> centavos)
+        self.sem_pagador = 0  # Centavos das contas sem pagador (fora do acerto)
+
+    def adicionar(self, lancamento):
+        self.somar(mes_da_data(lancamento.data), lancamento.pagador, para_centavos(lancamento.valor), lancamento.participantes)
+
+    def remover(self, lancamento):
+        self.somar(mes_da_data(lancamento.data), lancamento.pagador, -para_centavos(lancamento.valor), lancamento.participantes)
+
+    # Função para somar centavos pagos por uma pessoa num mês (negativo para desfazer)
+    def somar(self, mes, pagador, centavos, participantes=''):
+        if not pagador:
+            self.sem_pagador += centavos
+            return
+        self.pago[pagador] += centavos
+        self.total += centavos
+        self.total_grupo[participantes] += centavos
+        self.pago_mes.setdefault(mes, Counter())[pagador] += centavos
+        self.total_mes[mes] += centavos
+        self.total_mes_grupo.setdefault(mes, Counter())[participantes] += centavos
+
+    # Função para obter o saldo líquido de cada pessoa em centavos (positivo = tem a receber)
+    # mes=None considera todo o histórico; pesos (pessoa -> peso, padrão 1) vêm da coluna Peso
+    def liquidos(self, integrantes, mes=None, pesos=None):
+        pago = self.pago if mes is None else self.pago_mes.get(mes, Counter())
+        grupos = self.total_grupo if mes is None else self.total_mes_grupo.get(mes, Counter())
+
+        saldos = {pessoa: centavos for pessoa, centavos in pago.items() if centavos}
+        for grupo, total in grupos.items():
+            pessoas = separar_participantes(grupo) or integrantes  # Sem participantes: todos dividem
+            if not total or not pessoas:
+                continue
+            for pessoa, parte in dividir_centavos(total, pessoas, pesos).items():
+                saldos[pessoa] = saldos.get(pessoa, 0) - parte
+        return {pessoa: saldo for pessoa, saldo in saldos.items() if saldo}
+
+
+# Função para obter a lista de nomes da coluna Participantes (vazia = conta dividida por todos)
+def separar_participantes(texto):
+    return [nome.strip() for nome in texto.split(SEPARADOR_PARTICIPANTES) if nome.strip()]
+
+
+# Função para dividir centavos entre as pessoas na proporção dos pesos, sem perder nenhum centavo
+def dividir_centavos(total, pessoas, pesos=None):
+    if not pesos:
+        base, sobra = divmod(total, len(pessoas))  # Divisão igual: só inteiros
+        return {pessoa: base + (i < sobra) for i, pessoa in enumerate(pessoas)}
+
+    pesos = [pesos.get(pessoa, 1) for pessoa in pessoas]
+    soma_pesos = sum(pesos)
+    exatos = [total * peso / soma_pesos for peso in pesos]
+    partes = [int(exato // 1) for exato in exatos]
+    sobra = total - sum(partes)  # Entre 0 e len(pessoas) - 1 centavos
+    maiores = sorted(range(len(pessoas)), key=lambda i: partes[i] - exatos[i])[:sobra]  # Maiores frações
+    for i in maiores:
+        partes[i] += 1
+    return dict(zip(pessoas, partes))
+
+
+# Função para calcular as transferências que zeram os saldos: lista de (devedor, credor, centavos)
+def transferencias(liquidos):
+    credores = [(-saldo, pessoa) for pessoa, saldo in liquidos.items() if saldo > 0]  # Maior credor no topo
+    devedores = [(saldo, pessoa) for pessoa, saldo in liquidos.items() if saldo < 0]  # Maior devedor no topo
+    heapq.heapify(credores)
+    heapq.heapify(devedores)
+
+    resultado = []
+    while credores and devedores:
+        a_receber, credor = heapq.heappop(credores)
+        a_pagar, devedor = heapq.heappop(devedores)
+        valor = min(-a_receber, -a_pagar)
+        resultado.append((devedor, credor, valor))
+        if -a_receber > valor:
+            heapq.heappush(credores, (a_receber + valor, credor))
+        if -a_pagar > valor:
+            heapq.heappush(devedores, (a_pagar + valor, devedor))
+    return resultado
@@ -0,0 +1,153 @@
+# Índice de agregados por mês, por categoria e por mês×categoria
+#
+# O índice é atualizado a cada inclusão ou exclusão do diário, então o total de um mês, os gastos por
+# categoria e os indicadores do dashboard são lidos direto daqui, sem percorrer todas as contas.
+# Os valores são somados em centavos (inteiros) para que incluir e excluir não acumule erro de float.
+import heapq  # Heaps para manter mínimo e máximo mesmo com exclusões
+from bisect import bisect_left, bisect_right  # Busca binária na lista ordenada de meses
+from collections import Counter  # Contagem dos valores removidos ainda presentes nos heaps
+
+
+# Função para converter um valor em reais para centavos inteiros
+def para_centavos(valor):
+    return int(round(valor * 100))
+
+
+# Função para extrair o mês (AAAA-MM) da coluna Data
+def mes_da_data(data):
+    return data[:7]
+
+
+class Estatistica:
+    # Total, quantidade, mínimo e máximo de um grupo de contas (valores em centavos)
+    __slots__ = ('total', 'quantidade', '_menores', '_maiores', '_menores_removidos', '_maiores_removidos')
+
+    def __init__(self):
+        self.total = 0
+        self.quantidade = 0
+        self._menores = []  # Heap de mínimo
+        self._maiores = []  # Heap de máximo (valores negativos)
+        self._menores_removidos = Counter()  # Valores excluídos que ainda estão no heap de mínimo
+        self._maiores_removidos = Counter()  # Valores excluídos que ainda estão no heap de máximo
+
+    def adicionar(self, centavos):
+        self.total += centavos
+        self.quantidade += 1
+        heapq.heappush(self._menores, centavos)
+        heapq.heappush(self._maiores, -centavos)
+
+    def remover(self, centavos):
+        self.total -= centavos
+        self.quantidade -= 1
+        if self.quantidade == 0:
+            self.__init__()  # Grupo vazio: descarta os heaps de uma vez
+            return
+        self._menores_removidos[centavos] += 1  # Remoção preguiçosa: sai do heap quando chegar ao topo
+        self._maiores_removidos[-centavos] += 1
+
+    # Função para descartar do topo do heap os valores já excluídos
+    @staticmethod
+    def _topo(heap, removidos):
+        while removidos[heap[0]]:
+            removidos[heap[0]] -= 1
+            heapq.heappop(heap)
+        return heap[0]
+
+    @property
+    def soma(self):
+        return self.total / 100
+
+    @property
+    def media(self):
+        return self.total / self.quantidade / 100 if self.quantidade else 0.0
+
+    @property
+    def minimo(self):
+        return self._topo(self._menores, self._menores_removidos) / 100 if self.quantidade else None
+
+    @property
+    def maximo(self):
+        return -self._topo(self._maiores, self._maiores_removidos) / 100 if self.quantidade else None
+
+
+class IndiceAgregado:
+    # Agregados mantidos de forma incremental a partir das contas do diário
+    def __init__(self):
+        self.geral = Estatistica()  # Todas as contas
+        self.por_mes = {}  # mês -> Estatistica
+        self.por_conta = {}  # categoria -> Estatistica
+        self.por_mes_conta = {}  # mês -> {categoria -> Estatistica}
+        self._meses = []  # Meses com contas, em ordem
+        self._acumulados = None  # Somas prefixadas dos totais mensais (recalculadas quando algo muda)
+
+    # Função para registrar uma conta incluída
+    def adicionar(self, lancamento):
+        centavos = para_centavos(lancamento.valor)
+        mes = mes_da_data(lancamento.data)
+
+        if mes not in self.por_mes:
+            self.por_mes[mes] = Estatistica()
+            self.por_mes_conta[mes] = {}
+            self._meses.insert(bisect_left(self._meses, mes), mes)
+
+        self.geral.adicionar(centavos)
+        self.por_mes[mes].adicionar(centavos)
+        self.por_conta.setdefault(lancamento.conta, Estatistica()).adicionar(centavos)
+        self.por_mes_conta[mes].setdefault(lancamento.conta, Estatistica()).adicionar(centavos)
+        self._acumulados = None
+
+    # Função para registrar uma conta excluída
+    def remover(self, lancamento):
+        centavos = para_centavos(lancamento.valor)
+        mes = mes_da_data(lancamento.data)
+
+        self.geral.remover(centavos)
+        self._remover_de(self.por_mes, mes, centavos)
+        self._remover_de(self.por_conta, lancamento.conta, centavos)
+        self._remover_de(self.por_mes_conta[mes], lancamento.conta, centavos)
+
+        if mes not in self.por_mes:
+            del self.por_mes_conta[mes]
+            self._meses.pop(bisect_left(self._meses, mes))
+        self._acumulados = None
+
+    # Função para remover um valor de um grupo e apagar o grupo quando ficar vazio
+    @staticmethod
+    def _remover_de(grupos, chave, centavos):
+        estatistica = grupos[chave]
+        estatistica.remover(centavos)
+        if estatistica.quantidade == 0:
+            del grupos[chave]
+
+    # Função para listar os meses com contas, em ordem
+    def meses(self):
+        return list(self._meses)
+
+    # Função para obter o total de um mês (0 se não houver contas)
+    def total_mes(self, mes):
+        estatistica = self.por_mes.get(mes)
+        return estatistica.soma if estatistica else 0.0
+
+    # Função para obter os totais por categoria de um mês
+    def categorias_do_mes(self, mes):
+        return {conta: e.soma for conta, e in self.por_mes_conta.get(mes, {}).items()}
+
+    # Função para obter o total de cada mês, em ordem
+    def tendencia(self):
+        return [(mes, self.por_mes[mes].soma) for mes in self._meses]
+
+    # Função para obter o total de cada categoria
+    def categorias(self):
+        return {conta: e.soma for conta, e in self.por_conta.items()}
+
+    # Função para somar os meses entre inicio e fim (inclusive) usando as somas prefixadas
+    def total_periodo(self, inicio, fim):
+        if self._acumulados is None:
+            self._acumulados = [0]
+            for mes in self._meses:
+                self._acumulados.append(self._acumulados[-1] + self.por_mes[mes].total)
+        primeiro = bisect_left(self._meses, inicio)
+        ultimo = bisect_right(self._meses, fim)
+        if ultimo <= primeiro:
+            return 0.0
+        return (self._acumulados[ultimo] - self._acumulados[primeiro]) / 100
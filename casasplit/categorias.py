@@ -0,0 +1,13 @@
+# Tipos de conta oferecidos no cadastro do contas.py (também usados pelo gerador de dados do benchmark)
+TIPOS_CONTA = [
+    "Energia", "Água", "Internet", "Telefone Fixo", "Celular", "TV a Cabo", "IPTU",
+    "Aluguel", "Condomínio", "Seguro Residencial", "Gás", "Comida", "Supermercado",
+    "Feira", "Farmácia", "Plano de Saúde", "Academia", "Transporte", "Manutenção do Carro",
+    "Combustível", "Netflix", "Spotify", "Amazon Prime", "Disney+", "HBO Max",
+    "Apple Music", "YouTube Premium", "PlayStation Plus", "Xbox Game Pass", "Steam",
+    "Material de Escritório", "Materiais de Construção", "Móveis", "Eletrodomésticos",
+    "Produtos de Limpeza", "Produtos de Higiene", "Pet Shop", "Veterinário",
+    "Assinatura de Jornal/Revista", "Serviços de Streaming", "Taxa de Lixo",
+    "IPVA", "Seguro do Carro", "Taxa Bancária", "Fatura do Cartão de Crédito",
+    "Empréstimos", "Financiamento Imobiliário", "Financiamento de Veículo"
+]
\ No newline at end of file
@@ -0,0 +1,91 @@
+# Coordenação entre vários processos que gravam os mesmos arquivos (vários contas.py abertos ao mesmo tempo)
+#
+# TravaArquivo é uma trava consultiva entre processos (fcntl.flock no Linux/macOS, msvcrt.locking no
+# Windows) sobre um arquivo '.lock' ao lado do arquivo protegido; dentro do processo ela também serve
+# de trava entre threads e pode ser adquirida de novo pela mesma thread. Arquivos reescritos por
+# inteiro vão para um temporário com nome único e depois substituem o original de uma vez, então
+# leitores veem o arquivo antigo ou o novo, nunca um pela metade.
+import os  # Para abrir o arquivo de trava e substituir arquivos
+import tempfile  # Nomes únicos para os temporários
+import threading  # A trava entre processos não separa threads do mesmo processo
+import time  # Para esperar entre as tentativas no Windows
+
+if os.name == 'nt':
+    import msvcrt  # Trava de arquivos do Windows
+else:
+    import fcntl  # Trava de arquivos do Linux/macOS
+
+TENTATIVAS_SUBSTITUICAO = 20  # No Windows, os.replace falha enquanto outro processo lê o arquivo
+ESPERA_SUBSTITUICAO = 0.05  # Segundos entre as tentativas
+
+
+class TravaArquivo:
+    # Trava consultiva sobre 'caminho.lock', exclusiva entre processos e entre threads
+    def __init__(self, caminho):
+        self.caminho = f"{caminho}.lock"
+        self.local = threading.RLock()  # Só uma thread do processo disputa a trava do sistema
+        self.profundidade = 0  # Quantas vezes a thread dona adquiriu a trava
+        self.arquivo = None
+
+    def __enter__(self):
+        self.local.acquire()
+        if self.profundidade == 0:
+            try:
+                self._travar()
+            except BaseException:
+                self.local.release()
+                raise
+        self.profundidade += 1
+        return self
+
+    def __exit__(self, *erro):
+        self.profundidade -= 1
+        try:
+            if self.profundidade == 0:
+                self._destravar()
+        finally:
+            self.local.release()
+        return False
+
+    def _travar(self):
+        if self.arquivo is None:
+            self.arquivo = open(self.caminho, 'a+b')  # Mantido aberto entre os usos
+        if os.name == 'nt':
+            self.arquivo.seek(0)
+            while True:
+                try:
+                    msvcrt.locking(self.arquivo.fileno(), msvcrt.LK_LOCK, 1)  # Desiste após ~10 s; tenta de novo
+                    return
+                except OSError:
+                    continue
+        fcntl.flock(self.arquivo.fileno(), fcntl.LOCK_EX)
+
+    def _destravar(self):
+        if os.name == 'nt':
+            self.arquivo.seek(0)
+            msvcrt.locking(self.arquivo.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            fcntl.flock(self.arquivo.fileno(), fcntl.LOCK_UN)
+
+
+# Função para abrir um temporário com nome único na mesma pasta do arquivo (para a troca ser atômica)
+def abrir_temporario(caminho, modo='w', **opcoes):
+    pasta, nome = os.path.split(os.path.abspath(caminho))
+    descritor, temporario = tempfile.mkstemp(prefix=f"{nome}.", suffix='.tmp', dir=pasta)
+    try:
+        os.chmod(temporario, os.stat(caminho).st_mode & 0o777)  # Mantém as permissões do arquivo original
+    except FileNotFoundError:
+        os.chmod(temporario, 0o644)  # mkstemp cria o arquivo legível só pelo dono
+    return open(descritor, modo, **opcoes), temporario
+
+
+# Função para substituir o arquivo de forma atômica, tentando de novo se ele estiver aberto (Windows)
+def substituir(temporario, caminho):
+    for tentativa in range(TENTATIVAS_SUBSTITUICAO):
+        try:
+            os.replace(temporario, caminho)
+            return
+        except PermissionError:
+            if tentativa == TENTATIVAS_SUBSTITUICAO - 1:
+                raise
+            time.sleep(ESPERA_SUBSTITUICAO)
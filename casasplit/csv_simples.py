@@ -0,0 +1,51 @@
+# Leitura e gravação de CSVs simples só com a biblioteca padrão
+#
+# integrantes.csv tem uma ou duas colunas (Integrantes e, opcionalmente, Peso); abrir o pandas para isso deixa o contas.py e o integrantes.py
+# segundos mais lentos para mostrar a janela (principalmente nos executáveis do PyInstaller).
+import csv  # Biblioteca padrão para ler e escrever arquivos CSV
+import os  # Para gravar no disco antes da troca e apagar o temporário em caso de erro
+
+from casasplit.concorrencia import abrir_temporario, substituir  # Troca atômica do arquivo, segura entre processos
+from casasplit.medicao import medido  # Medição de tempo (desligada por padrão)
+
+
+# Função para ler uma coluna de um CSV como lista (lista vazia se o arquivo não existir)
+@medido('csv.ler_coluna')
+def ler_coluna(caminho, coluna):
+    try:
+        with open(caminho, newline='', encoding='utf-8') as arquivo:
+            return [linha[coluna] for linha in csv.DictReader(arquivo)]
+    except FileNotFoundError:
+        return []
+
+
+# Função para ler todas as linhas de um CSV como dicionários (lista vazia se o arquivo não existir)
+@medido('csv.ler_linhas')
+def ler_linhas(caminho):
+    try:
+        with open(caminho, newline='', encoding='utf-8') as arquivo:
+            return list(csv.DictReader(arquivo))
+    except FileNotFoundError:
+        return []
+
+
+# Função para gravar uma lista como um CSV de uma coluna
+def salvar_coluna(caminho, coluna, valores):
+    salvar_colunas(caminho, [coluna], ([valor] for valor in valores))
+
+
+# Função para gravar linhas em um CSV com as colunas informadas (escreve em um temporário e substitui)
+@medido('csv.salvar_colunas')
+def salvar_colunas(caminho, colunas, linhas):
+    arquivo, temporario = abrir_temporario(caminho, 'w', newline='', encoding='utf-8')  # Nome único por gravação
+    try:
+        with arquivo:
+            escritor = csv.writer(arquivo)
+            escritor.writerow(colunas)
+            escritor.writerows(linhas)
+            arquivo.flush()
+            os.fsync(arquivo.fileno())  # Garante que o conteúdo está no disco antes da troca
+        substituir(temporario, caminho)
+    except BaseException:
+        os.remove(temporario)
+        raise
@@ -0,0 +1,183 @@
+# Divisão das contas em lote: valor de cada integrante em todos os meses de várias casas de uma vez
+#
+# Cada casa é uma pasta com o diário (ou o contas.csv) e o integrantes.csv. Duas colunas opcionais
+# mudam a regra de "total / quantidade de integrantes":
+#   - Peso no integrantes.csv: cada integrante paga na proporção do seu peso (padrão 1);
+#   - Participantes nas contas: nomes separados por ';' de quem divide aquela conta (vazio = todos).
+# As contas de uma casa são somadas por (mês, grupo de participantes) num único groupby, e a matriz
+# meses × grupos é multiplicada pela matriz grupos × integrantes com a fração de cada um. Os centavos
+# que sobram no arredondamento vão para as maiores frações, então a soma do mês bate com o total.
+# As casas são distribuídas entre processos e o resultado de cada uma é escrito assim que fica pronto.
+#
+# Uso: python -m casasplit.divisao casa1 casa2 ... [--formato csv|jsonl] [--saida arquivo] [--processos N]
+import argparse  # Para ler os argumentos da linha de comando
+import csv  # Para ler o integrantes.csv
+import io  # Para ler o diário só até a última linha completa
+import os  # Para montar os caminhos
+import sys  # Saída padrão e mensagens de erro
+
+from casasplit.acerto import separar_participantes
+from casasplit.livro import ARQUIVO_CSV, ARQUIVO_DIARIO, OP_INSERIR, converter_valor
+from casasplit.medicao import medido
+
+ARQUIVO_INTEGRANTES = 'integrantes.csv'
+COLUNAS_SAIDA = ['Casa', 'Mes', 'Integrante', 'Peso', 'Valor']
+
+
+# Função para obter os nomes e os pesos das linhas do integrantes.csv (peso 1 se a coluna Peso faltar)
+# Usada pela divisão em lote, pelo contas.py e pelo dashboard: um peso inválido vira ValueError aqui
+def nomes_e_pesos(linhas):
+    nomes, pesos = [], []
+    for linha in linhas:
+        texto = linha.get('Peso') or 1
+        try:
+            peso = converter_valor(texto)
+        except ValueError:
+            peso = None
+        if peso is None or peso <= 0:
+            raise ValueError(f"o peso de {linha['Integrantes']} precisa ser um número positivo (está '{texto}')")
+        nomes.append(linha['Integrantes'])
+        pesos.append(peso)
+    return nomes, pesos
+
+
+# Função para ler os integrantes de uma casa e seus pesos
+def ler_integrantes(pasta):
+    with open(os.path.join(pasta, ARQUIVO_INTEGRANTES), newline='', encoding='utf-8') as arquivo:
+        try:
+            nomes, pesos = nomes_e_pesos(csv.DictReader(arquivo))
+        except ValueError as erro:
+            raise ValueError(f"{pasta}: {erro}") from None
+    if not nomes:
+        raise ValueError(f"{pasta}: nenhum integrante cadastrado")
+    return nomes, pesos
+
+
+# Função para ler as contas vivas de uma casa (do diário, se existir; senão do contas.csv)
+def ler_contas(pasta):
+    import pandas as pd  # Importado só quando necessário
+
+    diario = os.path.join(pasta, ARQUIVO_DIARIO)
+    if os.path.exists(diario):
+        with open(diario, 'rb') as arquivo:
+            dados = arquivo.read()
+        dados = dados[:dados.rfind(b'\n') + 1]  # Ignora uma última linha ainda incompleta
+        df = pd.read_csv(io.BytesIO(dados), dtype=str, keep_default_na=False)
+        df = df.drop_duplicates('Id', keep='last')  # Vale a última operação de cada conta
+        df = df[df['Op'] == OP_INSERIR]
+    else:
+        df = pd.read_csv(os.path.join(pasta, ARQUIVO_CSV), dtype=str, keep_default_na=False)
+    if 'Participantes' not in df:
+        df['Participantes'] = ''  # Diário ou contas.csv anterior à coluna
+    return df
+
+
+# Função para montar a matriz grupos × integrantes com a fração de cada integrante em cada grupo
+def matriz_de_grupos(grupos, nomes, pesos, pasta):
+    import numpy as np  # Importado só quando necessário
+
+    posicoes = {nome: i for i, nome in enumerate(nomes)}
+    matriz = np.zeros((len(grupos), len(nomes)))
+    for linha, grupo in enumerate(grupos):
+        participantes = separar_participantes(grupo)
+        if not participantes:
+            matriz[linha] = pesos  # Conta dividida por todos
+            continue
+        desconhecidos = [nome for nome in participantes if nome not in posicoes]
+        if desconhecidos:
+            raise ValueError(f"{pasta}: participantes fora do integrantes.csv: {', '.join(desconhecidos)}")
+        for nome in participantes:
+            matriz[linha, posicoes[nome]] = pesos[posicoes[nome]]
+    return matriz / matriz.sum(axis=1, keepdims=True)
+
+
+# Função para arredondar cada linha para centavos inteiros mantendo a soma da linha
+def arredondar_linhas(valores, totais):
+    import numpy as np  # Importado só quando necessário
+
+    inteiros = np.floor(valores).astype(np.int64)
+    faltando = totais - inteiros.sum(axis=1)  # Centavos que sobraram em cada linha
+    fracoes = valores - inteiros
+    ordem = np.argsort(-fracoes, axis=1, kind='stable')  # Maiores frações primeiro
+    posicao = np.argsort(ordem, axis=1)  # Posição de cada integrante nessa ordem
+    return inteiros + (posicao < faltando[:, None])
+
+
+# Função para calcular o valor de cada integrante em cada mês de uma casa
+@medido('divisao.casa')
+def dividir_casa(pasta):
+    import numpy as np  # Importado só quando necessário
+    import pandas as pd
+
+    nomes, pesos = ler_integrantes(pasta)
+    df = ler_contas(pasta)
+    casa = os.path.basename(os.path.normpath(os.path.abspath(pasta)))
+    if df.empty:
+        return pd.DataFrame(columns=COLUNAS_SAIDA)
+
+    centavos = (pd.to_numeric(df['Valor'].str.replace(',', '.', regex=False)) * 100).round().astype(np.int64)
+    totais = (
+        pd.DataFrame({'Mes': df['Data'].str[:7], 'Grupo': df['Participantes'], 'Centavos': centavos})
+        .groupby(['Mes', 'Grupo'])['Centavos'].sum()
+        .unstack(fill_value=0)  # Meses × grupos de participantes
+    )
+    fracoes = matriz_de_grupos(list(totais.columns), nomes, pesos, pasta)  # Grupos × integrantes
+
+    matriz = totais.to_numpy()
+    valores = arredondar_linhas(matriz @ fracoes, matriz.sum(axis=1))  # Meses × integrantes, em centavos
+
+    meses = len(totais.index)
+    return pd.DataFrame({
+        'Casa': casa,
+        'Mes': np.repeat(totais.index.to_numpy(), len(nomes)),
+        'Integrante': np.tile(nomes, meses),
+        'Peso': np.tile(pesos, meses),
+        'Valor': valores.ravel() / 100,
+    })
+
+
+# Função para calcular as casas, em paralelo quando houver mais de uma, na ordem em que foram pedidas
+def dividir_casas(pastas, processos=None):
+    if len(pastas) == 1 or processos == 1:
+        yield from map(dividir_casa, pastas)
+        return
+
+    from concurrent.futures import ProcessPoolExecutor  # Importado só quando necessário
+
+    with ProcessPoolExecutor(max_workers=processos) as executor:
+        yield from executor.map(dividir_casa, pastas)
+
+
+# Função para escrever os resultados à medida que cada casa fica pronta
+def escrever(resultados, formato, saida):
+    cabecalho = True
+    for df in resultados:
+        if formato == 'csv':
+            df.to_csv(saida, header=cabecalho, index=False, float_format='%.2f', lineterminator='\n')
+            cabecalho = False
+        elif not df.empty:
+            saida.write(df.to_json(orient='records', lines=True, force_ascii=False, double_precision=2).rstrip('\n') + '\n')
+        saida.flush()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Calcula o valor de cada integrante em todos os meses de uma ou mais casas.")
+    parser.add_argument('pastas', nargs='*', default=['.'], help="pastas das casas (padrão: a atual)")
+    parser.add_argument('--formato', choices=['csv', 'jsonl'], default='csv', help="formato da saída (padrão: csv)")
+    parser.add_argument('--saida', help="arquivo de saída (padrão: saída padrão)")
+    parser.add_argument('--processos', type=int, help="processos usados para as casas (padrão: um por núcleo)")
+    argumentos = parser.parse_args()
+
+    saida = open(argumentos.saida, 'w', newline='', encoding='utf-8') if argumentos.saida else sys.stdout
+    try:
+        escrever(dividir_casas(argumentos.pastas, argumentos.processos), argumentos.formato, saida)
+    except (OSError, ValueError, KeyError) as erro:
+        print(f"Erro: {erro}", file=sys.stderr)
+        sys.exit(1)
+    finally:
+        if saida is not sys.stdout:
+            saida.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+# Formatação de valores em reais (R$ 1.234,56) sem depender do locale do sistema
+#
+# locale.setlocale(LC_ALL, 'pt_BR.UTF-8') falha em máquinas sem esse locale gerado, e locale.currency
+# formata um valor por vez. Aqui a formatação é feita à mão: formatar_brl para um valor e
+# formatar_brl_vetor para uma coluna inteira de uma vez com operações do NumPy.
+import re  # Para limpar o texto na conversão de volta para número
+
+from casasplit.medicao import medido  # Medição de tempo (desligada por padrão)
+
+SIMBOLO = 'R$'  # Símbolo da moeda
+SEPARADOR_MILHAR = '.'  # Separador de milhar no Brasil
+SEPARADOR_DECIMAL = ','  # Separador decimal no Brasil
+
+
+# Função para formatar um valor em reais, como locale.currency(valor, grouping=True) no pt_BR
+def formatar_brl(valor):
+    centavos = round(abs(valor) * 100)
+    inteiro, resto = divmod(centavos, 100)
+    texto = f"{inteiro:,}".replace(',', SEPARADOR_MILHAR)
+    sinal = '-' if valor < 0 and centavos else ''
+    return f"{sinal}{SIMBOLO} {texto}{SEPARADOR_DECIMAL}{resto:02d}"
+
+
+# Função para formatar uma coluna inteira (lista, array do NumPy ou Series do pandas) de uma só vez
+#
+# Os textos são montados numa matriz de caracteres (uma linha por valor), preenchida da direita para a
+# esquerda: centavos, vírgula, um dígito por vez com o ponto a cada três, e por fim "R$ " e o sinal.
+# Cada passo vale para todos os valores juntos; no fim a matriz é lida como um array de strings.
+@medido('formatacao.vetor')
+def formatar_brl_vetor(valores):
+    import numpy as np  # Importado só quando necessário
+
+    numeros = np.asarray(valores, dtype=np.float64)
+    finitos = np.isfinite(numeros)
+    centavos = np.rint(np.abs(np.where(finitos, numeros, 0)) * 100).astype(np.int64)
+    inteiro, resto = np.divmod(centavos, 100)
+    negativo = (numeros < 0) & (centavos > 0)
+
+    # Quantidade de dígitos da parte inteira e tamanho final de cada texto
+    digitos = np.ones(len(numeros), dtype=np.int64)
+    potencia = 10
+    while potencia <= inteiro.max(initial=0):
+        digitos += inteiro >= potencia
+        potencia *= 10
+    tamanho = negativo + len(SIMBOLO) + 1 + digitos + (digitos - 1) // 3 + 3
+    largura = int(tamanho.max(initial=0))
+
+    # Uma coluna extra no fim recebe as escritas que não valem para uma linha (sem precisar de máscaras)
+    matriz = np.zeros((len(numeros), largura + 1), dtype=np.uint32)
+    linhas = np.arange(len(numeros))
+    fim = tamanho - 1
+    matriz[linhas, fim] = resto % 10 + ord('0')
+    matriz[linhas, fim - 1] = resto // 10 + ord('0')
+    matriz[linhas, fim - 2] = ord(SEPARADOR_DECIMAL)
+
+    restante = inteiro.copy()
+    for j in range(int(digitos.max(initial=0))):
+        posicao = fim - 3 - j - j // 3
+        matriz[linhas, np.where(j < digitos, posicao, largura)] = restante % 10 + ord('0')
+        if j and j % 3 == 0:
+            matriz[linhas, np.where(j < digitos, posicao + 1, largura)] = ord(SEPARADOR_MILHAR)
+        restante //= 10
+
+    inicio = negativo.astype(np.int64)
+    matriz[linhas, np.where(negativo, 0, largura)] = ord('-')
+    for k, caractere in enumerate(f"{SIMBOLO} "):
+        matriz[linhas, inicio + k] = ord(caractere)
+
+    # Cada linha da matriz vira uma string (os zeros do final são descartados)
+    if not len(numeros):
+        return _como_entrada(valores, np.array([], dtype=str))
+    texto = np.ascontiguousarray(matriz[:, :largura]).view(f'U{largura}').ravel()
+    texto = np.where(finitos, texto, '')  # NaN e infinito ficam em branco
+    return _como_entrada(valores, texto)
+
+
+# Função para converter um texto como "R$ 1.234,56" de volta para float
+def converter_brl(texto):
+    limpo = re.sub(r'[^\d,\-]', '', str(texto))  # Remove símbolo, espaços e separadores de milhar
+    return float(limpo.replace(SEPARADOR_DECIMAL, '.'))
+
+
+# Função para converter uma coluna inteira de textos em reais para números
+def converter_brl_vetor(textos):
+    import numpy as np  # Importado só quando necessário
+
+    limpos = np.asarray(textos, dtype=str)
+    for caractere in (SIMBOLO, ' ', '\xa0', SEPARADOR_MILHAR):
+        limpos = np.char.replace(limpos, caractere, '')
+    numeros = np.char.replace(limpos, SEPARADOR_DECIMAL, '.').astype(np.float64)
+    return _como_entrada(textos, numeros)
+
+
+# Função para devolver o resultado como Series (com o mesmo índice) quando a entrada for uma Series
+def _como_entrada(entrada, resultado):
+    if hasattr(entrada, 'iloc'):
+        return type(entrada)(resultado, index=entrada.index, name=entrada.name)
+    return resultado
@@ -0,0 +1,202 @@
+# Gráficos da dashboard: cache das imagens, redução de séries longas e gráficos nativos do Streamlit
+#
+# Cada gráfico do matplotlib é desenhado numa Figure própria (sem o pyplot, que guarda todas as figuras
+# abertas), salvo como PNG e descartado; o PNG fica num cache com a chave sendo o hash dos dados
+# agregados, então uma reexecução com os mesmos dados não desenha nada. Séries com muitos meses são
+# somadas por trimestre ou ano, e os rótulos de valor só aparecem quando há poucos pontos. As funções
+# especificacao_* montam gráficos Vega-Lite para st.vega_lite_chart, sem importar o matplotlib.
+import hashlib  # Para a chave do cache
+import io  # Para salvar o PNG em memória
+import threading  # Cada sessão do Streamlit roda numa thread e todas usam o mesmo cache
+from collections import OrderedDict  # Cache com descarte do item usado há mais tempo
+
+from casasplit.formatacao import formatar_brl_vetor  # Rótulos em reais
+from casasplit.medicao import medir  # Medição de tempo do desenho (desligada por padrão)
+
+MAXIMO_PONTOS = 36  # Acima disso, a tendência é somada por trimestre (e depois por ano)
+MAXIMO_ROTULOS = 24  # Acima disso, os pontos da tendência ficam sem rótulo de valor
+MAXIMO_CATEGORIAS = 15  # Acima disso, as menores categorias viram "Outras"
+MAXIMO_CACHE = 32  # Quantos gráficos desenhados ficam guardados
+
+TAMANHO_FIGURA = (8, 5)  # Polegadas, como nos gráficos originais da dashboard
+COR_TITULO = '#4B5563'
+COR_EIXO = '#6B7280'
+COR_GRADE = '#D1D5DB'
+COR_LINHA = '#1E3A8A'
+COR_ROTULO = '#1F2937'
+
+_cache = OrderedDict()  # chave -> PNG
+_trava_cache = threading.Lock()  # Protege o _cache; o desenho em si acontece fora da trava
+
+
+# Função para somar os totais mensais por trimestre ou por ano quando houver meses demais
+def reduzir_serie(meses, totais, maximo=MAXIMO_PONTOS):
+    if len(meses) <= maximo:
+        return list(meses), list(totais)
+
+    agrupadores = [
+        lambda mes: f"{mes[:4]}-T{(int(mes[5:7]) - 1) // 3 + 1}",  # Trimestre
+        lambda mes: mes[:4],  # Ano
+    ]
+    for agrupar in agrupadores:
+        grupos = OrderedDict()
+        for mes, total in zip(meses, totais):
+            chave = agrupar(mes)
+            grupos[chave] = grupos.get(chave, 0) + total
+        if len(grupos) <= maximo:
+            break
+    return list(grupos), list(grupos.values())
+
+
+# Função para manter as maiores categorias (na ordem recebida) e somar as demais em "Outras"
+def agrupar_categorias(contas, totais, maximo=MAXIMO_CATEGORIAS):
+    contas, totais = list(contas), list(totais)
+    if len(contas) <= maximo:
+        return contas, totais
+
+    maiores = set(sorted(range(len(contas)), key=lambda i: totais[i], reverse=True)[:maximo - 1])
+    outras = sum(total for i, total in enumerate(totais) if i not in maiores)
+    return (
+        [conta for i, conta in enumerate(contas) if i in maiores] + ['Outras'],
+        [total for i, total in enumerate(totais) if i in maiores] + [outras],
+    )
+
+
+# Função para calcular a chave do cache a partir do tipo de gráfico e dos dados agregados
+def _chave(tipo, rotulos, valores):
+    conteudo = repr((tipo, tuple(rotulos), tuple(round(v, 2) for v in valores)))
+    return hashlib.sha1(conteudo.encode('utf-8')).hexdigest()
+
+
+# Função para devolver o PNG do cache ou desenhá-lo com a função informada
+def _em_cache(tipo, rotulos, valores, desenhar):
+    chave = _chave(tipo, rotulos, valores)
+    with _trava_cache:
+        png = _cache.get(chave)
+        if png is not None:
+            _cache.move_to_end(chave)
+            return png
+
+    from matplotlib.backends.backend_agg import FigureCanvasAgg  # Importado só quando for desenhar
+    from matplotlib.figure import Figure
+
+    with medir(f'grafico.{tipo}'):  # Só o desenho de verdade é medido, não as leituras do cache
+        figura = Figure(figsize=TAMANHO_FIGURA)
+        FigureCanvasAgg(figura)
+        desenhar(figura.subplots(), rotulos, valores)
+        figura.tight_layout()
+        buffer = io.BytesIO()
+        figura.savefig(buffer, format='png')
+        figura.clear()  # A figura não é guardada em lugar nenhum: a memória é liberada aqui
+
+    png = buffer.getvalue()
+    with _trava_cache:
+        _cache[chave] = png
+        if len(_cache) > MAXIMO_CACHE:
+            _cache.popitem(last=False)  # Descarta o gráfico usado há mais tempo
+    return png
+
+
+# Função para obter n cores da paleta viridis (mesmas cores de sns.color_palette('viridis', n))
+def _cores_viridis(quantidade):
+    from matplotlib import colormaps  # Importado só quando for desenhar
+
+    mapa = colormaps['viridis']
+    return [mapa((i + 1) / (quantidade + 1)) for i in range(quantidade)]
+
+
+def _desenhar_tendencia(ax, meses, totais):
+    ax.plot(meses, totais, marker='o', linestyle='-', color=COR_LINHA, linewidth=2)  # Plota a linha de tendência
+    ax.set_title('Tendência de Gastos ao Longo do Tempo', fontsize=16, weight='bold', color=COR_TITULO)
+    ax.set_xlabel('Data (Ano-Mês)', fontsize=12, color=COR_EIXO)
+    ax.set_ylabel('Gastos em BRL', fontsize=12, color=COR_EIXO)
+    ax.grid(True, axis='y', linestyle='--', alpha=0.7, color=COR_GRADE)
+    ax.tick_params(axis='x', labelrotation=45)
+
+    # Adicionar rótulos aos pontos (só quando forem poucos, para continuarem legíveis)
+    if len(meses) <= MAXIMO_ROTULOS:
+        for mes, total, rotulo in zip(meses, totais, formatar_brl_vetor(totais)):
+            ax.text(mes, total, rotulo, ha='center', va='bottom', fontsize=10, color=COR_ROTULO)
+
+
+def _desenhar_categorias(ax, contas, totais):
+    ax.barh(contas, totais, color=_cores_viridis(len(contas)))  # Plota as barras
+    ax.invert_yaxis()  # Primeira categoria no topo
+    ax.set_title('Gastos por Categoria', fontsize=16, weight='bold', color=COR_TITULO)
+    ax.set_xlabel('Gastos em BRL', fontsize=12, color=COR_EIXO)
+    ax.set_ylabel('Categoria', fontsize=12, color=COR_EIXO)
+    ax.grid(True, axis='x', linestyle='--', alpha=0.7, color=COR_GRADE)
+
+
+def _desenhar_pizza(ax, contas, totais):
+    ax.pie(totais, labels=contas, autopct='%1.1f%%', startangle=140, colors=_cores_viridis(len(contas)))  # Plota a pizza
+    ax.set_title('Distribuição de Gastos por Categoria', fontsize=16, weight='bold', color=COR_TITULO)
+
+
+# Função para obter o PNG do gráfico de tendência
+def grafico_tendencia(meses, totais):
+    meses, totais = reduzir_serie(meses, totais)
+    return _em_cache('tendencia', meses, totais, _desenhar_tendencia)
+
+
+# Função para obter o PNG do gráfico de barras por categoria
+def grafico_categorias(contas, totais):
+    contas, totais = agrupar_categorias(contas, totais)
+    return _em_cache('categorias', contas, totais, _desenhar_categorias)
+
+
+# Função para obter o PNG do gráfico de pizza por categoria
+def grafico_pizza(contas, totais):
+    contas, totais = agrupar_categorias(contas, totais)
+    return _em_cache('pizza', contas, totais, _desenhar_pizza)
+
+
+# Função para montar a lista de registros usada pelo Vega-Lite
+def _registros(campo_rotulo, rotulos, valores):
+    return [{campo_rotulo: rotulo, 'Valor': valor} for rotulo, valor in zip(rotulos, valores)]
+
+
+# Função para montar o gráfico de tendência nativo (Vega-Lite)
+def especificacao_tendencia(meses, totais):
+    meses, totais = reduzir_serie(meses, totais)
+    return {
+        'title': 'Tendência de Gastos ao Longo do Tempo',
+        'data': {'values': _registros('Data', meses, totais)},
+        'mark': {'type': 'line', 'point': True, 'color': COR_LINHA},
+        'encoding': {
+            'x': {'field': 'Data', 'type': 'ordinal', 'title': 'Data (Ano-Mês)'},
+            'y': {'field': 'Valor', 'type': 'quantitative', 'title': 'Gastos em BRL'},
+            'tooltip': [{'field': 'Data'}, {'field': 'Valor', 'format': ',.2f'}],
+        },
+    }
+
+
+# Função para montar o gráfico de barras por categoria nativo (Vega-Lite)
+def especificacao_categorias(contas, totais):
+    contas, totais = agrupar_categorias(contas, totais)
+    return {
+        'title': 'Gastos por Categoria',
+        'data': {'values': _registros('Conta', contas, totais)},
+        'mark': 'bar',
+        'encoding': {
+            'y': {'field': 'Conta', 'type': 'nominal', 'sort': None, 'title': 'Categoria'},
+            'x': {'field': 'Valor', 'type': 'quantitative', 'title': 'Gastos em BRL'},
+            'color': {'field': 'Conta', 'type': 'nominal', 'scale': {'scheme': 'viridis'}, 'legend': None},
+            'tooltip': [{'field': 'Conta'}, {'field': 'Valor', 'format': ',.2f'}],
+        },
+    }
+
+
+# Função para montar o gráfico de pizza nativo (Vega-Lite)
+def especificacao_pizza(contas, totais):
+    contas, totais = agrupar_categorias(contas, totais)
+    return {
+        'title': 'Distribuição de Gastos por Categoria',
+        'data': {'values': _registros('Conta', contas, totais)},
+        'mark': {'type': 'arc'},
+        'encoding': {
+            'theta': {'field': 'Valor', 'type': 'quantitative', 'stack': True},
+            'color': {'field': 'Conta', 'type': 'nominal', 'scale': {'scheme': 'viridis'}, 'title': 'Categoria'},
+            'tooltip': [{'field': 'Conta'}, {'field': 'Valor', 'format': ',.2f'}],
+        },
+    }
\ No newline at end of file
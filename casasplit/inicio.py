@@ -0,0 +1,21 @@
+# Marcação do momento em que a primeira janela aparece, usada pelo benchmark de inicialização
+#
+# Com a variável de ambiente CASASPLIT_MEDIR_INICIO definida, o app escreve MARCADOR na saída padrão
+# assim que a janela principal é mapeada na tela e fecha em seguida. Sem a variável, nada acontece.
+import os  # Para ler a variável de ambiente
+
+VARIAVEL = 'CASASPLIT_MEDIR_INICIO'  # Liga a marcação
+MARCADOR = 'casasplit:janela-pronta'  # Linha escrita quando a janela aparece
+
+
+# Função para avisar (e fechar o app) quando a janela principal aparecer, se a medição estiver ligada
+def avisar_janela_pronta(root):
+    if not os.environ.get(VARIAVEL):
+        return
+
+    def pronta(evento):
+        if evento.widget is root:
+            print(MARCADOR, flush=True)
+            root.after(0, root.destroy)
+
+    root.bind('<Map>', pronta, add='+')
@@ -0,0 +1,168 @@
+# Instantâneo colunar (Parquet) do diário, para históricos muito grandes
+#
+# O instantâneo guarda as contas vivas em colunas tipadas: Mes como inteiro AAAAMM, Conta, Pagador e
+# Participantes com codificação de dicionário (viram categoria no pandas) e Valor em centavos inteiros. As linhas ficam
+# ordenadas por mês, então ler um mês só (filtro em Mes) pula os grupos de linhas dos outros meses, e
+# a leitura usa mapeamento em memória e só as colunas pedidas. Precisa do pyarrow, que é opcional.
+#
+# Uso: python -m casasplit.instantaneo   (gera o contas.parquet a partir do diário)
+import json  # Para guardar a assinatura do diário nos metadados do arquivo
+import os  # Para verificar se o instantâneo existe, gravar no disco e apagar o temporário em caso de erro
+from collections import namedtuple  # Para os indicadores gerais do resumo
+
+from casasplit.acerto import Saldos
+from casasplit.concorrencia import abrir_temporario, substituir
+from casasplit.livro import ARQUIVO_DIARIO, abrir_livro, assinatura_arquivo
+from casasplit.medicao import medido
+
+ARQUIVO_INSTANTANEO = 'contas.parquet'  # Instantâneo gerado a partir do diário
+LINHAS_POR_GRUPO = 64 * 1024  # Tamanho dos grupos de linhas (unidade que o filtro por mês consegue pular)
+CHAVE_METADADOS = b'casasplit.diario'  # Assinatura do diário que originou o instantâneo
+
+# Indicadores gerais, com os mesmos nomes da Estatistica do índice de agregados
+Indicadores = namedtuple('Indicadores', ['soma', 'media', 'minimo', 'maximo', 'quantidade'])
+
+
+# Função para saber se o pyarrow está instalado
+def instantaneo_disponivel():
+    try:
+        import pyarrow.parquet  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+# Função para converter 'AAAA-MM' em AAAAMM
+def mes_para_inteiro(mes):
+    return int(mes[:4]) * 100 + int(mes[5:7])
+
+
+# Função para converter AAAAMM em 'AAAA-MM'
+def inteiro_para_mes(numero):
+    return f"{numero // 100:04d}-{numero % 100:02d}"
+
+
+# Função para gravar o instantâneo das contas vivas do diário
+@medido('instantaneo.salvar')
+def salvar_instantaneo(livro=None, caminho=ARQUIVO_INSTANTANEO):
+    import pyarrow as pa  # Importado só quando necessário
+    import pyarrow.parquet as pq
+
+    livro = livro or abrir_livro()
+    with livro.trava_arquivo, livro.trava:  # Nenhum processo acrescenta linhas entre a leitura e a assinatura
+        livro.sincronizar()
+        lancamentos = list(livro.lancamentos.values())
+        assinatura = assinatura_arquivo(livro.caminho)
+    lancamentos.sort(key=lambda l: l.data[:7])  # Agrupa as linhas por mês
+
+    tabela = pa.table({
+        'Id': pa.array([l.id for l in lancamentos], pa.string()),
+        'Mes': pa.array([mes_para_inteiro(l.data) for l in lancamentos], pa.int32()),
+        'Conta': pa.array([l.conta for l in lancamentos], pa.string()).dictionary_encode(),
+        'Valor': pa.array([round(l.valor * 100) for l in lancamentos], pa.int64()),
+        'Pagador': pa.array([l.pagador for l in lancamentos], pa.string()).dictionary_encode(),
+        'Participantes': pa.array([l.participantes for l in lancamentos], pa.string()).dictionary_encode(),
+    })
+    tabela = tabela.replace_schema_metadata({CHAVE_METADADOS: json.dumps(assinatura).encode()})
+
+    arquivo, temporario = abrir_temporario(caminho, 'wb')  # Nome único: vários processos podem gravar juntos
+    try:
+        with arquivo:
+            pq.write_table(tabela, arquivo, row_group_size=LINHAS_POR_GRUPO, write_statistics=True)
+            arquivo.flush()
+            os.fsync(arquivo.fileno())  # Garante que o conteúdo está no disco antes da troca
+        substituir(temporario, caminho)  # Leitores veem o instantâneo antigo ou o novo, nunca um pela metade
+    except BaseException:
+        os.remove(temporario)
+        raise
+
+
+# Função para saber se o instantâneo corresponde ao diário atual (ou se não há diário)
+def instantaneo_atualizado(caminho=ARQUIVO_INSTANTANEO, caminho_diario=ARQUIVO_DIARIO):
+    import pyarrow.parquet as pq  # Importado só quando necessário
+
+    if not os.path.exists(caminho):
+        return False
+    diario = assinatura_arquivo(caminho_diario)
+    if diario is None:
+        return True  # Só existe o instantâneo (por exemplo, numa publicação da dashboard)
+    metadados = pq.read_schema(caminho).metadata or {}
+    return json.loads(metadados.get(CHAVE_METADADOS, b'null')) == list(diario)
+
+
+# Função para ler as contas de um mês (ou de todos), só com as colunas pedidas
+@medido('instantaneo.carregar')
+def carregar_instantaneo(caminho=ARQUIVO_INSTANTANEO, mes=None, colunas=('Mes', 'Conta', 'Valor')):
+    import pyarrow.parquet as pq  # Importado só quando necessário
+
+    filtros = [('Mes', '=', mes_para_inteiro(mes))] if mes else None
+    tabela = pq.read_table(caminho, columns=list(colunas), filters=filtros, memory_map=True)
+    df = tabela.to_pandas()  # Conta vira categoria do pandas
+
+    if 'Mes' in df:
+        meses = df.pop('Mes')
+        df.insert(0, 'Data', meses.map(inteiro_para_mes) if len(meses) else meses.astype(str))
+    if 'Valor' in df:
+        df['Valor'] = df['Valor'] / 100
+    return df
+
+
+class ResumoInstantaneo:
+    # Agregados calculados a partir do instantâneo (mesmos métodos usados do IndiceAgregado)
+    @medido('instantaneo.resumo')
+    def __init__(self, caminho=ARQUIVO_INSTANTANEO):
+        import pyarrow.compute as pc  # Importado só quando necessário
+        import pyarrow.parquet as pq
+
+        existentes = pq.read_schema(caminho).names  # Instantâneos antigos não têm as colunas do acerto
+        grupos = [coluna for coluna in ('Pagador', 'Participantes') if coluna in existentes]
+        colunas = ['Mes', 'Conta', 'Valor'] + grupos
+        tabela = pq.read_table(caminho, columns=colunas, memory_map=True)
+        valores = tabela['Valor']
+
+        por_mes = tabela.group_by('Mes').aggregate([('Valor', 'sum')]).sort_by('Mes')
+        self._meses = [inteiro_para_mes(m) for m in por_mes['Mes'].to_pylist()]
+        self._totais = dict(zip(self._meses, (v / 100 for v in por_mes['Valor_sum'].to_pylist())))
+
+        por_conta = tabela.group_by('Conta').aggregate([('Valor', 'sum')])
+        self._categorias = {
+            str(conta): total / 100 for conta, total in zip(por_conta['Conta'].to_pylist(), por_conta['Valor_sum'].to_pylist())
+        }
+
+        # Quanto cada pessoa pagou por mês e grupo de participantes, para o acerto de contas
+        self.saldos = Saldos()
+        if 'Pagador' in grupos:
+            por_pagador = tabela.group_by(['Mes'] + grupos).aggregate([('Valor', 'sum')])
+            participantes = por_pagador['Participantes'].to_pylist() if 'Participantes' in grupos else [''] * len(por_pagador)
+            for mes, pagador, grupo, total in zip(
+                por_pagador['Mes'].to_pylist(), por_pagador['Pagador'].to_pylist(), participantes, por_pagador['Valor_sum'].to_pylist()
+            ):
+                self.saldos.somar(inteiro_para_mes(mes), pagador, total, grupo)
+
+        quantidade = len(valores)
+        soma = (pc.sum(valores).as_py() or 0) / 100
+        extremos = pc.min_max(valores).as_py()
+        self.geral = Indicadores(
+            soma=soma,
+            media=soma / quantidade if quantidade else 0.0,
+            minimo=extremos['min'] / 100 if quantidade else None,
+            maximo=extremos['max'] / 100 if quantidade else None,
+            quantidade=quantidade,
+        )
+
+    def meses(self):
+        return list(self._meses)
+
+    def total_mes(self, mes):
+        return self._totais.get(mes, 0.0)
+
+    def tendencia(self):
+        return list(self._totais.items())
+
+    def categorias(self):
+        return dict(self._categorias)
+
+
+if __name__ == "__main__":
+    salvar_instantaneo()
+    print(f"Instantâneo gravado em '{ARQUIVO_INSTANTANEO}'.")
@@ -0,0 +1,446 @@
+# Armazenamento das contas em um diário (journal) somente de acréscimo
+#
+# Cada conta salva vira uma linha acrescentada ao final de 'contas.diario.csv', então salvar custa O(1)
+# em vez de ler e reescrever o arquivo inteiro. Toda conta recebe um id único e persistente; excluir
+# grava uma lápide ('E') com esse id, com o mesmo custo qualquer que seja o tamanho do diário. Uma
+# compactação em segundo plano reescreve o diário apenas com as contas vivas quando as linhas mortas
+# passam do limite.
+# O 'contas.csv' no formato antigo (Data,Conta,Valor) é importado na primeira execução e pode ser
+# exportado a qualquer momento com exportar_csv().
+# As colunas são lidas pelo cabeçalho, então diários sem as colunas Pagador e Participantes continuam
+# legíveis; ao serem abertos, eles são compactados uma vez para ganhar as colunas novas.
+#
+# Vários processos podem gravar o mesmo diário: acréscimos, compactação, importação e exportação
+# acontecem com a trava 'contas.diario.csv.lock' (TravaArquivo), e arquivos reescritos por inteiro
+# trocam de lugar com o original de uma vez. Leitores não usam a trava: só leem linhas completas e
+# percebem quando o diário foi substituído pela geração, uma marca aleatória que cada diário novo leva
+# no cabeçalho (o inode sozinho não basta: o sistema de arquivos reaproveita o de um diário já
+# substituído). Gravações que chegam juntas viram um único fsync (commit em grupo, em _anexar).
+import csv  # Biblioteca padrão para ler e escrever arquivos CSV
+import io  # Para montar as linhas do CSV em memória antes de gravar
+import math  # Para recusar valores infinitos ou NaN
+import os  # Para consultar e substituir arquivos
+import threading  # Para compactar o diário em segundo plano
+import uuid  # Para gerar identificadores únicos para cada conta
+from collections import namedtuple  # Para representar cada conta como uma tupla com nomes
+
+from casasplit.acerto import Saldos  # Quanto cada pessoa pagou, para o acerto de contas
+from casasplit.agregados import IndiceAgregado  # Totais por mês e categoria mantidos a cada operação
+from casasplit.concorrencia import TravaArquivo, abrir_temporario, substituir  # Gravação segura entre processos
+from casasplit.medicao import medido  # Medição de tempo das operações (desligada por padrão)
+
+ARQUIVO_DIARIO = 'contas.diario.csv'  # Diário com todas as operações (fonte da verdade)
+ARQUIVO_CSV = 'contas.csv'  # Arquivo no formato antigo, importado na primeira execução
+
+COLUNAS_DIARIO = ['Id', 'Op', 'Data', 'Conta', 'Valor', 'Pagador', 'Participantes']  # Colunas gravadas no diário
+COLUNAS_CSV = ['Data', 'Conta', 'Valor', 'Pagador', 'Participantes']  # Colunas do formato antigo (mais quem pagou e quem divide)
+
+PREFIXO_GERACAO = 'Geracao:'  # Última coluna do cabeçalho: marca do diário, nova a cada substituição
+
+OP_INSERIR = 'I'  # Operação de inclusão de uma conta
+OP_EXCLUIR = 'E'  # Operação de exclusão (lápide) de uma conta
+
+MINIMO_COMPACTACAO = 64  # Não compacta diários pequenos
+LIMITE_COMPACTACAO = 0.5  # Compacta quando mais da metade das linhas estiver morta
+BLOCO_REPARO = 64 * 1024  # Bytes lidos do fim do diário para achar a última linha completa
+VALOR_MAXIMO = 1e13  # Acima disso o float já não guarda os centavos com exatidão
+
+# Cada conta viva do diário (pagador vazio: conta gravada sem pagador; participantes: nomes separados
+# por ';' de quem divide a conta, vazio = todos os integrantes)
+Lancamento = namedtuple('Lancamento', ['id', 'data', 'conta', 'valor', 'pagador', 'participantes'], defaults=['', ''])
+
+
+# Função para gerar um novo identificador de conta
+def novo_id():
+    return uuid.uuid4().hex[:16]  # 64 bits aleatórios são suficientes para não haver colisões
+
+
+# Função para montar o cabeçalho de um diário novo com a geração informada
+def cabecalho_diario(geracao):
+    return COLUNAS_DIARIO + [PREFIXO_GERACAO + geracao]
+
+
+# Função para ler a geração de um diário aberto em modo binário ('' se o cabeçalho não tiver a marca;
+# None se o cabeçalho ainda não estiver completo)
+def _ler_geracao(arquivo):
+    arquivo.seek(0)
+    cabecalho = arquivo.readline()
+    if not cabecalho.endswith(b'\n'):
+        return None
+    for nome in next(csv.reader([cabecalho.decode('utf-8')])):
+        if nome.startswith(PREFIXO_GERACAO):
+            return nome[len(PREFIXO_GERACAO):]
+    return ''  # Diário anterior à marca
+
+
+# Função para validar um valor antes de gravá-lo ou aplicá-lo (recusa infinito, NaN e valores enormes)
+def validar_valor(valor):
+    valor = float(valor)
+    if not math.isfinite(valor) or abs(valor) >= VALOR_MAXIMO:
+        raise ValueError(f"valor inválido: {valor}")
+    return valor
+
+
+# Função para converter o texto da coluna Valor em float (aceita vírgula como separador decimal)
+def converter_valor(texto):
+    return validar_valor(str(texto).replace(',', '.'))
+
+
+# Função para obter a assinatura de um arquivo (identidade, tamanho e modificação); None se não existir
+def assinatura_arquivo(caminho):
+    try:
+        estado = os.stat(caminho)
+    except FileNotFoundError:
+        return None
+    return (estado.st_dev, estado.st_ino, estado.st_size, estado.st_mtime_ns)
+
+
+# Função para gravar um arquivo inteiro de forma atômica (escreve em um temporário e substitui)
+def _substituir_arquivo(caminho, colunas, linhas):
+    arquivo, temporario = abrir_temporario(caminho, 'w', newline='', encoding='utf-8')  # Nome único por gravação
+    try:
+        with arquivo:
+            escritor = csv.writer(arquivo)
+            escritor.writerow(colunas)
+            escritor.writerows(linhas)
+            arquivo.flush()
+            os.fsync(arquivo.fileno())  # Garante que o conteúdo está no disco antes da troca
+        substituir(temporario, caminho)  # A troca é atômica: leitores veem o arquivo antigo ou o novo
+    except BaseException:
+        os.remove(temporario)
+        raise
+
+
+# Função para descartar o fim de um diário deixado sem '\n' por um processo interrompido no meio da escrita
+# (chamada com a trava do arquivo: ninguém mais está escrevendo)
+def _reparar_final(arquivo):
+    tamanho = arquivo.seek(0, os.SEEK_END)
+    if tamanho == 0:
+        return
+    inicio = max(0, tamanho - BLOCO_REPARO)
+    arquivo.seek(inicio)
+    bloco = arquivo.read()
+    if bloco.endswith(b'\n'):
+        return
+    arquivo.truncate(inicio + bloco.rfind(b'\n') + 1)
+    arquivo.seek(0, os.SEEK_END)
+
+
+class Livro:
+    # Abre o diário, importando o contas.csv antigo se o diário ainda não existir
+    def __init__(self, caminho=ARQUIVO_DIARIO, caminho_csv=ARQUIVO_CSV):
+        self.caminho = caminho
+        self.caminho_csv = caminho_csv
+        self.lancamentos = {}  # Contas vivas por id, na ordem em que foram incluídas
+        self.indice = IndiceAgregado()  # Agregados das contas vivas
+        self.saldos = Saldos()  # Quanto cada pessoa pagou das contas vivas
+        self.registros = 0  # Total de linhas de operação no diário (vivas e mortas)
+        self.invalidas = 0  # Linhas ignoradas por estarem corrompidas ou com valor inválido
+        self.posicao = 0  # Quantos bytes do diário já foram lidos
+        self.identidade = None  # (dispositivo, inode, geração) do diário lido, para detectar substituições
+        self.indices = {}  # Posição de cada coluna, lida do cabeçalho do diário
+        self.versao = 0  # Aumenta a cada operação aplicada; serve de chave para caches de dados derivados
+        self.alteracoes = None  # Ids tocados desde a última coleta (dict ordenado), se alguém acompanha
+        self.recarregado = False  # O diário foi relido do início desde a última coleta
+        self.trava = threading.RLock()  # Protege o estado em memória entre threads
+        self.trava_arquivo = TravaArquivo(caminho)  # Exclusão entre processos (sempre adquirida antes de self.trava)
+        self.compactacao = None  # Thread da compactação em andamento, se houver
+
+        # Commit em grupo: linhas esperando a próxima escrita e o andamento dos lotes
+        self.condicao = threading.Condition()
+        self.pendentes = []  # Linhas do lote aberto
+        self.lote_aberto = 1  # Lote que está recebendo linhas
+        self.lote_gravado = 0  # Último lote gravado (com ou sem erro)
+        self.gravando = False  # Uma thread líder está gravando um lote
+        self.falhas = {}  # lote -> erro da gravação, para as threads que esperavam por ele
+
+        if not os.path.exists(self.caminho) and os.path.exists(self.caminho_csv):
+            with self.trava_arquivo:
+                if not os.path.exists(self.caminho):  # Outro processo pode ter importado enquanto esperávamos
+                    self.importar_csv(self.caminho_csv)
+
+        self.sincronizar()
+        if self.indices and not set(COLUNAS_DIARIO) <= self.indices.keys():
+            self.compactar()  # Reescreve o diário antigo com o cabeçalho novo antes da primeira gravação
+
+    def __len__(self):
+        return len(self.lancamentos)
+
+    def __iter__(self):
+        return iter(self.lancamentos.values())
+
+    # Função para importar um CSV no formato Data,Conta,Valor como diário novo
+    @medido('livro.importar_csv')
+    def importar_csv(self, caminho_csv):
+        with open(caminho_csv, newline='', encoding='utf-8') as arquivo:
+            linhas = [
+                [novo_id(), OP_INSERIR, linha['Data'], linha['Conta'], converter_valor(linha['Valor']),
+                 linha.get('Pagador') or '', linha.get('Participantes') or '']
+                for linha in csv.DictReader(arquivo)
+            ]
+        _substituir_arquivo(self.caminho, cabecalho_diario(novo_id()), linhas)
+
+    # Função para exportar as contas vivas no formato Data,Conta,Valor
+    @medido('livro.exportar_csv')
+    def exportar_csv(self, caminho_csv=None):
+        with self.trava_arquivo:  # Nenhum processo grava entre a leitura e a troca do arquivo
+            with self.trava:
+                self._sincronizar()
+                linhas = [[l.data, l.conta, l.valor, l.pagador, l.participantes] for l in self.lancamentos.values()]
+            _substituir_arquivo(caminho_csv or self.caminho_csv, COLUNAS_CSV, linhas)
+
+    # Função para ler apenas o que foi acrescentado ao diário desde a última leitura
+    @medido('livro.sincronizar')
+    def sincronizar(self):
+        with self.trava:
+            self._sincronizar()
+
+    def _sincronizar(self):
+        try:
+            arquivo = open(self.caminho, 'rb')
+        except FileNotFoundError:
+            return  # Nada gravado ainda
+
+        with arquivo:
+            # A identidade vem do arquivo já aberto: se o diário for substituído agora, esta leitura
+            # continua no arquivo antigo e a troca é percebida na próxima sincronização
+            estado = os.fstat(arquivo.fileno())
+            identidade = (estado.st_dev, estado.st_ino, _ler_geracao(arquivo))
+            if identidade != self.identidade or estado.st_size < self.posicao:
+                # O diário foi substituído (compactação ou importação): recomeça do início
+                self.lancamentos = {}
+                self.indice = IndiceAgregado()
+                self.saldos = Saldos()
+                self.registros = 0
+                self.invalidas = 0
+                self.posicao = 0
+                self.indices = {}
+                self.identidade = identidade
+                self.recarregado = self.alteracoes is not None  # As exclusões feitas por quem substituiu se perdem
+
+            if estado.st_size == self.posicao:
+                return
+
+            arquivo.seek(self.posicao)
+            bloco = arquivo.read()
+
+        fim = bloco.rfind(b'\n') + 1  # Ignora uma última linha ainda incompleta
+        if fim == 0:
+            return
+
+        for linha in csv.reader(io.StringIO(bloco[:fim].decode('utf-8'), newline='')):
+            if not linha:
+                continue
+            if not self.indices:
+                self.indices = {nome: i for i, nome in enumerate(linha)}  # Primeira linha é o cabeçalho
+                continue
+            try:
+                self._aplicar(linha)
+            except (ValueError, IndexError):
+                # Uma linha ruim não pode travar o diário: fica de fora e conta como morta (some na compactação)
+                self.invalidas += 1
+                self.registros += 1
+        self.posicao += fim  # Só avança depois de aplicar o bloco
+
+    # Função para aplicar uma linha do diário ao estado em memória
+    # (a linha é toda lida antes de mexer no estado, então uma linha inválida não deixa nada pela metade)
+    def _aplicar(self, linha):
+        indices = self.indices
+        id_conta = linha[indices['Id']]
+        lancamento = None
+        if linha[indices['Op']] == OP_INSERIR:
+            tamanho = len(linha)
+            pagador = indices.get('Pagador', tamanho)  # Diários antigos não têm as colunas opcionais
+            participantes = indices.get('Participantes', tamanho)
+            lancamento = Lancamento(
+                id_conta, linha[indices['Data']], linha[indices['Conta']], validar_valor(linha[indices['Valor']]),
+                linha[pagador] if pagador < tamanho else '',
+                linha[participantes] if participantes < tamanho else '',
+            )
+
+        if self.alteracoes is not None:
+            self.alteracoes[id_conta] = None
+        anterior = self.lancamentos.pop(id_conta, None)
+        if anterior is not None:
+            self.indice.remover(anterior)
+            self.saldos.remover(anterior)
+        if lancamento is not None:
+            self.lancamentos[id_conta] = lancamento
+            self.indice.adicionar(lancamento)
+            self.saldos.adicionar(lancamento)
+        self.registros += 1
+        self.versao += 1
+
+    # Função para começar a anotar as contas incluídas e excluídas (por este ou por outros processos)
+    def acompanhar_alteracoes(self):
+        with self.trava:
+            self.alteracoes = {}
+            self.recarregado = False
+
+    # Função para obter as contas alteradas desde a última coleta: lista de (id, conta ou None se excluída)
+    # Devolve None se o diário foi relido do início e quem acompanha precisa copiar tudo de novo
+    def coletar_alteracoes(self):
+        with self.trava:
+            if self.alteracoes is None:
+                return []
+            ids, self.alteracoes = self.alteracoes, {}
+            if self.recarregado:
+                self.recarregado = False
+                return None
+            return [(id_conta, self.lancamentos.get(id_conta)) for id_conta in ids]
+
+    # Função para acrescentar linhas ao final do diário e aplicá-las à memória
+    #
+    # Commit em grupo: as linhas entram no lote aberto. Se nenhuma thread estiver gravando, esta vira a
+    # líder: fecha o lote, grava todas as linhas dele numa escrita só, com um único fsync, e acorda as
+    # outras. Quem chega enquanto a líder grava espera e sai junto no lote seguinte, então com muitos
+    # escritores cada fsync leva várias contas de uma vez. Retorna quando as linhas já estão no disco
+    # e aplicadas à memória.
+    def _anexar(self, linhas):
+        with self.condicao:
+            self.pendentes.extend(linhas)
+            lote = self.lote_aberto
+            while self.gravando and self.lote_gravado < lote:
+                self.condicao.wait()
+            if self.lote_gravado >= lote:
+                # Outra thread gravou o lote destas linhas
+                if lote in self.falhas:
+                    raise self.falhas[lote]
+                return
+            self.gravando = True
+            linhas_lote, self.pendentes = self.pendentes, []
+            self.lote_aberto += 1
+
+        try:
+            self._gravar(linhas_lote)
+        except BaseException as erro:
+            with self.condicao:
+                self.falhas[lote] = erro
+            raise
+        finally:
+            with self.condicao:
+                self.gravando = False
+                self.lote_gravado = lote
+                self.condicao.notify_all()
+
+    # Função para gravar um lote de linhas no final do diário (uma escrita e um fsync)
+    def _gravar(self, linhas):
+        buffer = io.StringIO()
+        escritor = csv.writer(buffer)
+        with self.trava_arquivo:
+            with open(self.caminho, 'a+b') as arquivo:
+                _reparar_final(arquivo)
+                if arquivo.tell() == 0:
+                    escritor.writerow(cabecalho_diario(novo_id()))  # Primeiro registro: grava o cabeçalho
+                escritor.writerows(linhas)
+                arquivo.write(buffer.getvalue().encode('utf-8'))  # Uma única escrita no final do arquivo
+                arquivo.flush()
+                os.fsync(arquivo.fileno())
+
+        with self.trava:
+            self._sincronizar()  # Lê de volta apenas as linhas novas
+
+    # Função para incluir uma conta; retorna o id gerado
+    @medido('livro.inserir')
+    def inserir(self, data, conta, valor, pagador='', participantes=''):
+        id_conta = novo_id()
+        self._anexar([[id_conta, OP_INSERIR, data, conta, validar_valor(valor), pagador, participantes]])
+        return id_conta
+
+    # Função para excluir uma conta pelo id (grava uma lápide, sem percorrer o diário)
+    @medido('livro.excluir')
+    def excluir(self, id_conta):
+        if id_conta not in self.lancamentos:
+            return False
+        self._anexar([[id_conta, OP_EXCLUIR] + [''] * (len(COLUNAS_DIARIO) - 2)])
+        self.compactar_se_necessario()
+        return True
+
+    # Função para reescrever o diário só com as contas vivas
+    @medido('livro.compactar')
+    def compactar(self):
+        # Fotografa as contas vivas; inclusões e exclusões feitas durante a reescrita continuam liberadas
+        with self.trava:
+            self._sincronizar()
+            identidade, posicao, registros, invalidas = self.identidade, self.posicao, self.registros, self.invalidas
+            linhas = [[l.id, OP_INSERIR, l.data, l.conta, l.valor, l.pagador, l.participantes] for l in self.lancamentos.values()]
+
+        geracao = novo_id()  # Marca do diário novo, diferente da de qualquer diário anterior
+        arquivo, temporario = abrir_temporario(self.caminho, 'w', newline='', encoding='utf-8')
+        try:
+            with arquivo:
+                escritor = csv.writer(arquivo)
+                escritor.writerow(cabecalho_diario(geracao))
+                escritor.writerows(linhas)
+
+            # Com a trava do arquivo, nenhum processo acrescenta linhas entre a cópia do final e a troca
+            with self.trava_arquivo, self.trava:
+                self._sincronizar()
+                if self.identidade != identidade:
+                    os.remove(temporario)  # Outro processo substituiu o diário; descarta esta compactação
+                    return
+
+                # Copia para o diário novo as linhas gravadas depois da fotografia
+                with open(self.caminho, 'rb') as antigo, open(temporario, 'ab') as novo:
+                    antigo.seek(posicao)
+                    novo.write(antigo.read(self.posicao - posicao))
+                    novo.flush()
+                    os.fsync(novo.fileno())
+                substituir(temporario, self.caminho)
+
+                # As contas em memória não mudam; só a posição de leitura, a contagem de linhas e o cabeçalho
+                estado = os.stat(self.caminho)
+                self.identidade = (estado.st_dev, estado.st_ino, geracao)
+                self.posicao = estado.st_size
+                self.registros = len(linhas) + self.registros - registros
+                self.invalidas -= invalidas  # As linhas inválidas da fotografia não foram copiadas
+                self.indices = {nome: i for i, nome in enumerate(COLUNAS_DIARIO)}
+        except BaseException:
+            if os.path.exists(temporario):
+                os.remove(temporario)
+            raise
+
+    # Função para compactar em segundo plano quando as linhas mortas passarem do limite
+    def compactar_se_necessario(self):
+        mortos = self.registros - len(self.lancamentos)
+        if self.registros < MINIMO_COMPACTACAO or mortos <= self.registros * LIMITE_COMPACTACAO:
+            return
+        if self.compactacao is not None and self.compactacao.is_alive():
+            return  # Já existe uma compactação em andamento
+        self.compactacao = threading.Thread(target=self.compactar, daemon=True)
+        self.compactacao.start()
+
+    # Função para aguardar a compactação em segundo plano terminar
+    def aguardar_compactacao(self):
+        if self.compactacao is not None:
+            self.compactacao.join()
+
+    # Função para montar um DataFrame com as contas vivas (o id fica no índice)
+    @medido('livro.para_dataframe')
+    def para_dataframe(self):
+        import pandas as pd  # Importado só quando necessário
+
+        with self.trava:
+            lancamentos = list(self.lancamentos.values())
+        # Tipos explícitos: sem contas, o pandas criaria colunas float e as de texto perderiam o .str
+        indice = pd.Index([l.id for l in lancamentos], name='Id', dtype=str)
+        return pd.DataFrame({
+            'Data': pd.Series([l.data for l in lancamentos], index=indice, dtype=str),
+            'Conta': pd.Series([l.conta for l in lancamentos], index=indice, dtype=str),
+            'Valor': pd.Series([l.valor for l in lancamentos], index=indice, dtype=float),
+            'Pagador': pd.Series([l.pagador for l in lancamentos], index=indice, dtype=str),
+            'Participantes': pd.Series([l.participantes for l in lancamentos], index=indice, dtype=str),
+        })
+
+
+_livros = {}  # Livros já abertos neste processo, por caminho
+
+
+# Função para obter o livro do caminho informado, reaproveitando o que já foi lido
+def abrir_livro(caminho=ARQUIVO_DIARIO, caminho_csv=ARQUIVO_CSV):
+    livro = _livros.get(caminho)
+    if livro is None:
+        livro = _livros[caminho] = Livro(caminho, caminho_csv)
+    else:
+        livro.sincronizar()  # Lê apenas o que outro processo tenha acrescentado
+    return livro
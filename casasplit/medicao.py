@@ -0,0 +1,176 @@
+# Medição de tempo (e, opcionalmente, de memória) das etapas pesadas do contas.py e da dashboard
+#
+# As funções de carga, gravação, exclusão, agregação e desenho são marcadas com @medido('etapa'), e
+# trechos soltos com "with medir('etapa')". Desligada (o padrão), a marcação custa duas verificações de
+# variável por chamada. Ligada para o processo todo pela variável de ambiente CASASPLIT_MEDIR (ou por
+# ativar()), ou só para a thread atual por ativar_na_thread() (cada sessão da dashboard roda numa
+# thread), cada chamada vira um registro JSON numa linha do log rotativo 'casasplit.medicao.log' e
+# entra nos coletores em memória, de onde saem os percentis de cada etapa.
+#
+#   CASASPLIT_MEDIR=1         mede o tempo
+#   CASASPLIT_MEDIR=memoria   mede também a memória alocada (tracemalloc, bem mais lento)
+import functools  # Para preservar o nome das funções marcadas
+import os  # Para ler a variável de ambiente e o id do processo
+import threading  # Coletor da thread atual (cada sessão do Streamlit roda numa thread)
+import time  # Para medir o tempo
+from collections import defaultdict, deque  # Últimas durações de cada etapa
+from contextlib import contextmanager  # Para medir trechos com "with"
+
+VARIAVEL = 'CASASPLIT_MEDIR'  # Liga a medição ('1' ou 'memoria')
+ARQUIVO_LOG = 'casasplit.medicao.log'  # Log com um registro JSON por linha
+TAMANHO_LOG = 1024 * 1024  # Bytes por arquivo antes de rodar o log
+ARQUIVOS_LOG = 3  # Arquivos antigos mantidos (casasplit.medicao.log.1, .2, ...)
+MAXIMO_AMOSTRAS = 1000  # Durações guardadas por etapa em cada coletor
+PERCENTIS = (50, 90, 99)
+
+_ativo = False  # Lido a cada chamada marcada; o resto só roda com a medição ligada
+_memoria = False
+_log = None
+_trava_log = threading.Lock()  # Duas sessões podem ligar a medição ao mesmo tempo
+
+
+class _Local(threading.local):
+    # Estado de cada thread: medição ligada só para ela e coletor que recebe os registros dela
+    ativo = False
+    memoria = False
+    coletor = None
+
+
+_local = _Local()
+
+
+class Coletor:
+    # Últimas durações (em ms) de cada etapa, para os percentis
+    def __init__(self, maximo=MAXIMO_AMOSTRAS):
+        self.amostras = defaultdict(lambda: deque(maxlen=maximo))
+
+    def adicionar(self, etapa, ms):
+        self.amostras[etapa].append(ms)
+
+    # Função para obter {etapa: (quantidade, p50, p90, p99)} em ms
+    def percentis(self):
+        resumo = {}
+        for etapa, amostras in sorted(self.amostras.items()):
+            ordenadas = sorted(amostras)
+            quantidade = len(ordenadas)
+            resumo[etapa] = (quantidade,) + tuple(
+                ordenadas[min(quantidade - 1, quantidade * p // 100)] for p in PERCENTIS
+            )
+        return resumo
+
+    def limpar(self):
+        self.amostras.clear()
+
+
+coletor_global = Coletor()  # Recebe todos os registros do processo
+
+
+# Função para ligar a medição no processo todo; memoria=True mede também as alocações
+def ativar(memoria=False, arquivo=ARQUIVO_LOG):
+    global _ativo, _memoria
+    _preparar(memoria, arquivo)
+    _memoria = memoria
+    _ativo = True
+
+
+# Função para desligar a medição do processo (o log continua aberto para uma nova ativação)
+def desativar():
+    global _ativo, _memoria
+    _ativo = False
+    _memoria = False
+
+
+# Função para ligar a medição só na thread atual, sem afetar as outras
+def ativar_na_thread(memoria=False, arquivo=ARQUIVO_LOG):
+    _preparar(memoria, arquivo)
+    _local.memoria = memoria
+    _local.ativo = True
+
+
+# Função para desligar a medição da thread atual (a do processo, se ligada, continua valendo)
+def desativar_na_thread():
+    _local.ativo = False
+    _local.memoria = False
+
+
+# Função para saber se as chamadas da thread atual estão sendo medidas
+def ativo():
+    return _ativo or _local.ativo
+
+
+# Função para abrir o log e, se pedido, ligar o tracemalloc
+def _preparar(memoria, arquivo):
+    global _log
+    with _trava_log:
+        if _log is None:
+            import logging  # Importado só quando a medição é ligada
+            from logging.handlers import RotatingFileHandler
+
+            log = logging.getLogger('casasplit.medicao')
+            log.setLevel(logging.INFO)
+            log.propagate = False
+            saida = RotatingFileHandler(arquivo, maxBytes=TAMANHO_LOG, backupCount=ARQUIVOS_LOG, encoding='utf-8', delay=True)
+            saida.setFormatter(logging.Formatter('%(message)s'))
+            log.addHandler(saida)
+            _log = log  # Só fica visível pronto, com a saída já configurada
+    if memoria:
+        import tracemalloc  # Importado só quando a memória é medida
+
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+
+# Função para direcionar os registros da thread atual também a um coletor (None para parar)
+def usar_coletor(coletor):
+    _local.coletor = coletor
+
+
+# Função para medir um trecho de código
+@contextmanager
+def medir(etapa):
+    if not _ativo and not _local.ativo:
+        yield
+        return
+
+    memoria = _memoria or _local.memoria
+    if memoria:
+        import tracemalloc
+
+        antes = tracemalloc.get_traced_memory()[0]
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        ms = (time.perf_counter() - inicio) * 1000
+        registro = {'ts': round(time.time(), 3), 'pid': os.getpid(), 'etapa': etapa, 'ms': round(ms, 3)}
+        if memoria:
+            registro['alocado_bytes'] = tracemalloc.get_traced_memory()[0] - antes
+        _registrar(registro)
+
+
+# Decorador para medir cada chamada de uma função
+def medido(etapa):
+    def decorar(funcao):
+        @functools.wraps(funcao)
+        def medida(*args, **kwargs):
+            if not _ativo and not _local.ativo:
+                return funcao(*args, **kwargs)  # Desligada: só estas verificações a mais
+            with medir(etapa):
+                return funcao(*args, **kwargs)
+        return medida
+    return decorar
+
+
+def _registrar(registro):
+    import json  # Importado só com a medição ligada
+
+    coletor_global.adicionar(registro['etapa'], registro['ms'])
+    coletor = _local.coletor
+    if coletor is not None:
+        coletor.adicionar(registro['etapa'], registro['ms'])
+    _log.info(json.dumps(registro, ensure_ascii=False))
+
+
+# Liga a medição na importação quando a variável de ambiente estiver definida
+if os.environ.get(VARIAVEL):
+    ativar(memoria=os.environ[VARIAVEL].lower() == 'memoria')
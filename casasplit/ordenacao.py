@@ -0,0 +1,90 @@
+# Índices ordenados por coluna para a tabela de contas
+#
+# Para cada coluna é mantida uma lista ordenada de (chave, sequência, id). Incluir ou excluir uma conta
+# só acha a posição com busca binária em cada lista, e a ordem decrescente é a mesma lista lida de trás
+# para frente. Assim, clicar em um cabeçalho só troca qual lista a tabela lê, sem ordenar nada.
+from bisect import bisect_left, insort  # Busca binária e inserção em listas ordenadas
+
+INSERCAO = None  # "Coluna" da ordem em que as contas foram incluídas
+
+
+class VisaoOrdenada:
+    # campos: coluna -> função que extrai a chave de ordenação de uma conta
+    def __init__(self, campos):
+        self.campos = campos
+        self.indices = {coluna: [] for coluna in campos}  # coluna -> lista ordenada de (chave, seq, id)
+        self.indices[INSERCAO] = []  # Lista de (seq, id), já ordenada por chegada
+        self.entradas = {}  # id -> (seq, {coluna: chave}) para localizar a conta em cada lista
+        self.sequencia = 0  # Desempata chaves iguais pela ordem de inclusão
+        self.coluna = INSERCAO  # Coluna usada na exibição
+        self.crescente = True  # Direção da exibição
+
+    # Função para construir os índices de uma vez a partir das contas existentes
+    def carregar(self, lancamentos):
+        self.entradas = {}
+        self.indices = {coluna: [] for coluna in self.campos}
+        insercao = []
+        for lancamento in lancamentos:
+            chaves = {coluna: extrair(lancamento) for coluna, extrair in self.campos.items()}
+            self.entradas[lancamento.id] = (self.sequencia, chaves)
+            insercao.append((self.sequencia, lancamento.id))
+            for coluna, chave in chaves.items():
+                self.indices[coluna].append((chave, self.sequencia, lancamento.id))
+            self.sequencia += 1
+        for lista in self.indices.values():
+            lista.sort()
+        self.indices[INSERCAO] = insercao
+
+    # Função para incluir uma conta em todos os índices (busca binária em cada um)
+    def adicionar(self, lancamento):
+        seq = self.sequencia
+        self.sequencia += 1
+        chaves = {coluna: extrair(lancamento) for coluna, extrair in self.campos.items()}
+        self.entradas[lancamento.id] = (seq, chaves)
+        self.indices[INSERCAO].append((seq, lancamento.id))
+        for coluna, chave in chaves.items():
+            insort(self.indices[coluna], (chave, seq, lancamento.id))
+
+    # Função para excluir uma conta de todos os índices
+    def remover(self, id_conta):
+        seq, chaves = self.entradas.pop(id_conta)
+        self._remover_de(self.indices[INSERCAO], (seq, id_conta))
+        for coluna, chave in chaves.items():
+            self._remover_de(self.indices[coluna], (chave, seq, id_conta))
+
+    @staticmethod
+    def _remover_de(lista, item):
+        del lista[bisect_left(lista, item)]
+
+    # Função para escolher a coluna e a direção exibidas (não reordena nada)
+    def ordenar(self, coluna, crescente=True):
+        self.coluna = coluna
+        self.crescente = crescente
+
+    def __len__(self):
+        return len(self.entradas)
+
+    def __contains__(self, id_conta):
+        return id_conta in self.entradas
+
+    # Função para obter as chaves guardadas de uma conta ({coluna: valor}), sem consultar o diário
+    def chaves(self, id_conta):
+        return self.entradas[id_conta][1]
+
+    # Função para obter os ids exibidos entre as posições inicio e fim
+    def fatia(self, inicio, fim):
+        lista = self.indices[self.coluna]
+        if not self.crescente:
+            total = len(lista)
+            inicio, fim = total - fim, total - inicio
+            itens = reversed(lista[max(0, inicio):max(0, fim)])
+        else:
+            itens = lista[inicio:fim]
+        return [item[-1] for item in itens]
+
+    # Função para obter a posição de um id na exibição atual
+    def posicao(self, id_conta):
+        seq, chaves = self.entradas[id_conta]
+        item = (seq, id_conta) if self.coluna is INSERCAO else (chaves[self.coluna], seq, id_conta)
+        posicao = bisect_left(self.indices[self.coluna], item)
+        return posicao if self.crescente else len(self.entradas) - 1 - posicao
@@ -0,0 +1,141 @@
+# Tabela virtual sobre um ttk.Treeview
+#
+# O modelo (os ids na ordem de exibição) fica em memória e o Treeview recebe apenas as linhas que cabem
+# na tela. Rolar redesenha só essa janela, e incluir ou excluir uma conta altera uma posição do modelo
+# em vez de reconstruir a tabela inteira. O modelo precisa oferecer len(), 'in', fatia(inicio, fim) e
+# posicao(id), como a VisaoOrdenada de casasplit.ordenacao.
+import tkinter as tk  # Biblioteca tkinter para criar interfaces gráficas
+from tkinter import ttk  # Para widgets estilizados
+
+from casasplit.medicao import medido  # Medição de tempo (desligada por padrão)
+
+ALTURA_LINHA_PADRAO = 20  # Altura de uma linha antes da primeira medição
+ALTURA_CABECALHO_PADRAO = 24  # Altura do cabeçalho antes da primeira medição
+
+
+class TabelaVirtual:
+    # Cria o Treeview e a barra de rolagem; formatar_linha(id) devolve os valores exibidos de uma linha
+    def __init__(self, master, colunas, modelo, formatar_linha):
+        self.formatar_linha = formatar_linha
+        self.modelo = modelo  # Ids de todas as linhas, na ordem de exibição
+        self.inicio = 0  # Posição da primeira linha visível
+        self.janela = 20  # Quantas linhas cabem na tela
+        self.visiveis = []  # Ids desenhados no Treeview agora
+        self.selecao = None  # Id selecionado (mesmo que tenha saído da tela)
+        self.altura_linha = ALTURA_LINHA_PADRAO
+        self.altura_cabecalho = ALTURA_CABECALHO_PADRAO
+
+        self.arvore = ttk.Treeview(master, columns=colunas, show="headings", selectmode="browse")
+        self.barra = ttk.Scrollbar(master, orient=tk.VERTICAL, command=self._rolar)
+
+        self.arvore.bind("<Configure>", self._redimensionar)
+        self.arvore.bind("<MouseWheel>", self._roda_mouse)  # Windows e macOS
+        self.arvore.bind("<Button-4>", lambda evento: self._mover(-3))  # Linux: roda para cima
+        self.arvore.bind("<Button-5>", lambda evento: self._mover(3))  # Linux: roda para baixo
+        self.arvore.bind("<Up>", lambda evento: self._mover_selecao(-1))
+        self.arvore.bind("<Down>", lambda evento: self._mover_selecao(1))
+
+    # Função para posicionar a tabela e a barra de rolagem com grid
+    def grid(self, row, column):
+        self.arvore.grid(row=row, column=column, sticky="nsew")
+        self.barra.grid(row=row, column=column + 1, sticky="ns")
+
+    # Função para voltar ao topo depois que a ordem do modelo mudou (por exemplo, ao ordenar)
+    def reiniciar(self):
+        self.inicio = 0
+        self._desenhar()
+
+    # Função para redesenhar a janela depois de incluir ou excluir linhas no modelo
+    def atualizar(self):
+        self._desenhar()
+
+    # Função para obter o id da linha selecionada (ou None)
+    def selecionado(self):
+        atual = self.arvore.selection()
+        if atual:
+            self.selecao = atual[0]
+        elif self.selecao in self.visiveis:
+            self.selecao = None  # A linha está na tela e não está mais selecionada
+        return self.selecao
+
+    # Função para desenhar no Treeview apenas as linhas da janela visível
+    @medido('tabela.desenhar')
+    def _desenhar(self, guardar_selecao=True):
+        if guardar_selecao:
+            self.selecionado()  # Guarda a seleção antes de apagar as linhas da tela
+        if self.selecao not in self.modelo:
+            self.selecao = None  # A linha selecionada foi excluída
+
+        self.inicio = max(0, min(self.inicio, len(self.modelo) - self.janela))
+        self.visiveis = self.modelo.fatia(self.inicio, self.inicio + self.janela)
+
+        self.arvore.delete(*self.arvore.get_children())
+        for id_linha in self.visiveis:
+            self.arvore.insert("", "end", iid=id_linha, values=self.formatar_linha(id_linha))
+
+        if self.selecao in self.visiveis:
+            self.arvore.selection_set(self.selecao)
+
+        # Atualiza a barra de rolagem com a fração visível do modelo
+        total = len(self.modelo)
+        if total:
+            self.barra.set(self.inicio / total, (self.inicio + len(self.visiveis)) / total)
+        else:
+            self.barra.set(0, 1)
+
+        self._medir()
+
+    # Função para medir a altura real das linhas e do cabeçalho depois de desenhar
+    def _medir(self):
+        if not self.visiveis:
+            return
+        caixa = self.arvore.bbox(self.visiveis[0])
+        if caixa and caixa[3] > 0 and (caixa[1], caixa[3]) != (self.altura_cabecalho, self.altura_linha):
+            self.altura_cabecalho, self.altura_linha = caixa[1], caixa[3]
+            self._ajustar_janela(self.arvore.winfo_height())
+
+    # Função para recalcular quantas linhas cabem quando a janela muda de tamanho
+    def _redimensionar(self, evento):
+        self._ajustar_janela(evento.height)
+
+    def _ajustar_janela(self, altura):
+        janela = max(1, (altura - self.altura_cabecalho) // self.altura_linha)
+        if janela != self.janela:
+            self.janela = janela
+            self._desenhar()
+
+    # Função chamada pela barra de rolagem
+    def _rolar(self, acao, quantidade, unidade=None):
+        if acao == "moveto":
+            self.inicio = int(float(quantidade) * len(self.modelo))
+            self._desenhar()
+        elif unidade == "pages":
+            self._mover(int(quantidade) * self.janela)
+        else:
+            self._mover(int(quantidade))
+
+    # Função para tratar a roda do mouse no Windows e no macOS
+    def _roda_mouse(self, evento):
+        passo = -evento.delta // 120 if abs(evento.delta) >= 120 else -evento.delta  # O macOS envia passos pequenos
+        return self._mover(passo * 3)
+
+    # Função para deslocar a janela visível
+    def _mover(self, linhas):
+        self.inicio += linhas
+        self._desenhar()
+        return "break"
+
+    # Função para mover a seleção com as setas, rolando quando sair da tela
+    def _mover_selecao(self, passo):
+        atual = self.selecionado()
+        if atual is None or atual not in self.modelo:
+            return None  # Deixa o Treeview tratar a tecla
+        posicao = max(0, min(self.modelo.posicao(atual) + passo, len(self.modelo) - 1))
+        self.selecao = self.modelo.fatia(posicao, posicao + 1)[0]
+        if posicao < self.inicio:
+            self.inicio = posicao
+        elif posicao >= self.inicio + self.janela:
+            self.inicio = posicao - self.janela + 1
+        self._desenhar(guardar_selecao=False)
+        self.arvore.focus(self.selecao)
+        return "break"
@@ -0,0 +1,94 @@
+# Execução de tarefas de leitura e gravação fora da thread da interface do tkinter
+#
+# As funções pesadas (ler e gravar arquivos) rodam numa thread de trabalho; os resultados voltam para
+# a thread do tkinter por uma fila consultada com root.after, e só ali os callbacks mexem nos widgets.
+# Tarefas com a mesma chave que ainda não começaram são juntadas: só a última pedida é executada.
+import queue  # Fila segura entre threads para devolver os resultados
+import threading  # Thread de trabalho e trava para as tarefas juntadas por chave
+
+INTERVALO_CONSULTA = 30  # Milissegundos entre as consultas à fila enquanto houver tarefas pendentes
+
+
+class ExecutorTk:
+    # ao_mudar_ocupado(ocupado) é chamado na thread do tkinter quando começa ou termina o trabalho pendente
+    def __init__(self, root, ao_mudar_ocupado=None):
+        self.root = root
+        self.ao_mudar_ocupado = ao_mudar_ocupado
+        self.tarefas = queue.Queue()  # Tarefas para a thread de trabalho
+        self.resultados = queue.Queue()  # Resultados para a thread do tkinter
+        self.pendentes = 0  # Tarefas enviadas cujo callback ainda não rodou
+        self.agendadas = {}  # chave -> última tarefa pedida que ainda não começou
+        self.trava = threading.Lock()
+        # Uma thread só (sem concurrent.futures, que deixa a abertura do app mais lenta): as gravações seguem a ordem pedida
+        self.thread = threading.Thread(target=self._trabalhar, daemon=True)
+        self.thread.start()
+
+    # Função para executar funcao(*args) na thread de trabalho
+    # ao_concluir(resultado) e ao_falhar(erro) rodam depois na thread do tkinter
+    def executar(self, funcao, *args, ao_concluir=None, ao_falhar=None, chave=None):
+        tarefa = (funcao, args, ao_concluir, ao_falhar)
+        if chave is not None:
+            with self.trava:
+                ja_agendada = chave in self.agendadas
+                self.agendadas[chave] = tarefa  # Substitui a pedida anterior, se ainda não começou
+            if ja_agendada:
+                return
+            self._enviar(self._executar_agendada, chave)
+        else:
+            self._enviar(self._executar, tarefa)
+
+    def _enviar(self, funcao, argumento):
+        self.pendentes += 1
+        if self.pendentes == 1:
+            if self.ao_mudar_ocupado:
+                self.ao_mudar_ocupado(True)
+            self.root.after(INTERVALO_CONSULTA, self._consultar)
+        self.tarefas.put((funcao, argumento))
+
+    # Roda na thread de trabalho: executa as tarefas na ordem em que chegaram
+    def _trabalhar(self):
+        while True:
+            item = self.tarefas.get()
+            if item is None:
+                return
+            funcao, argumento = item
+            funcao(argumento)
+
+    # Roda na thread de trabalho
+    def _executar_agendada(self, chave):
+        with self.trava:
+            tarefa = self.agendadas.pop(chave)
+        self._executar(tarefa)
+
+    # Roda na thread de trabalho
+    def _executar(self, tarefa):
+        funcao, args, ao_concluir, ao_falhar = tarefa
+        try:
+            resultado = funcao(*args)
+        except Exception as erro:
+            self.resultados.put((ao_falhar, erro))
+        else:
+            self.resultados.put((ao_concluir, resultado))
+
+    # Roda na thread do tkinter: entrega os resultados prontos aos callbacks
+    def _consultar(self):
+        try:
+            while True:
+                try:
+                    callback, valor = self.resultados.get_nowait()
+                except queue.Empty:
+                    break
+                self.pendentes -= 1
+                if callback:
+                    callback(valor)
+        finally:
+            # Mesmo se um callback falhar, continua consultando enquanto houver tarefas pendentes
+            if self.pendentes:
+                self.root.after(INTERVALO_CONSULTA, self._consultar)
+            elif self.ao_mudar_ocupado:
+                self.ao_mudar_ocupado(False)
+
+    # Função para esperar as tarefas pendentes e encerrar a thread de trabalho
+    def encerrar(self):
+        self.tarefas.put(None)
+        self.thread.join()
@@ -1,140 +1,251 @@
-import pandas as pd  # Biblioteca pandas para manipulação de dados em formato de tabela
+import os  # Para localizar a pasta raiz do projeto
+import sys  # Para permitir importar o pacote casasplit
 import tkinter as tk  # Biblioteca tkinter para criar interfaces gráficas
 from tkinter import messagebox  # Para exibir caixas de mensagem
 from tkinter import ttk  # Para widgets estilizados
 
-import locale  # Biblioteca para configuração de localidade (idioma, formato de números, datas, etc.)
-
-# Configurar o locale para o Brasil
-locale.setlocale(locale.LC_ALL, 'pt_BR.UTF-8')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))  # Permite importar o pacote da raiz do projeto
+# Só módulos leves são importados aqui, para a janela abrir rápido; pandas e pyarrow ficam para quando forem usados
+from casasplit.acerto import transferencias  # Transferências que zeram os saldos do acerto de contas
+from casasplit.categorias import TIPOS_CONTA  # Tipos de conta oferecidos no cadastro
+from casasplit.csv_simples import ler_coluna, ler_linhas  # Leitura de CSV só com a biblioteca padrão
+from casasplit.formatacao import formatar_brl  # Formata valores em reais sem depender do locale do sistema
+from casasplit.inicio import avisar_janela_pronta  # Usado pelo benchmark de inicialização
+from casasplit.livro import abrir_livro, validar_valor  # Diário das contas (inclusões em O(1))
+from casasplit.medicao import medido  # Medição de tempo das etapas pesadas (desligada por padrão)
+from casasplit.ordenacao import VisaoOrdenada  # Índices ordenados por coluna para a tabela
+from casasplit.tabela_virtual import TabelaVirtual  # Tabela que desenha só as linhas visíveis
+from casasplit.tarefas import ExecutorTk  # Executa leituras e gravações fora da thread da interface
 
 # Variável global para armazenar a ordem de classificação das colunas
-ordem_colunas = {"Data": True, "Conta": True, "Valor": True}
+ordem_colunas = {"Data": True, "Conta": True, "Valor": True, "Pagador": True}
+
+# Chave de ordenação de cada coluna da tabela
+campos_colunas = {
+    "Data": lambda lancamento: lancamento.data,
+    "Conta": lambda lancamento: lancamento.conta,
+    "Valor": lambda lancamento: lancamento.valor,
+    "Pagador": lambda lancamento: lancamento.pagador,
+}
+
+visao = VisaoOrdenada(campos_colunas)  # Ordem de exibição da tabela, com um índice ordenado por coluna
+executor = None  # Executa as leituras e gravações fora da thread da interface
+MAXIMO_TRANSFERENCIAS = 20  # Transferências listadas na mensagem do acerto de contas
 
 # Função para carregar os integrantes do arquivo CSV
 def carregar_integrantes():
-    try:
-        df = pd.read_csv('integrantes.csv')  # Carrega os dados do arquivo CSV
-        return list(df['Integrantes'])  # Retorna os nomes dos integrantes como uma lista
-    except FileNotFoundError:
+    if not os.path.exists('integrantes.csv'):
         return ["Nenhum integrante cadastrado"]  # Retorna uma mensagem se o arquivo não for encontrado
+    return ler_coluna('integrantes.csv', 'Integrantes')  # Retorna os nomes dos integrantes como uma lista
+
+# Função para ler só os integrantes cadastrados (lista vazia se não houver o arquivo)
+def ler_integrantes_cadastrados():
+    if not os.path.exists('integrantes.csv'):
+        return []
+    return ler_coluna('integrantes.csv', 'Integrantes')
+
+# Função para executar uma tarefa que usa o diário e depois levar à tabela o que mudou nele
+# (contas incluídas ou excluídas por esta tarefa ou por outro contas.py aberto ao mesmo tempo)
+def executar_no_livro(funcao, ao_concluir=None, ao_falhar=None):
+    # Roda na thread de trabalho
+    def tarefa():
+        resultado = funcao()
+        return resultado, abrir_livro().coletar_alteracoes()
+
+    # Roda na thread da interface
+    def concluir(retorno):
+        resultado, alteracoes = retorno
+        aplicar_alteracoes(alteracoes)
+        if ao_concluir:
+            ao_concluir(resultado)
+
+    executor.executar(tarefa, ao_concluir=concluir, ao_falhar=ao_falhar)
+
+# Função para aplicar aos índices da tabela as contas alteradas no diário (roda na thread da interface)
+def aplicar_alteracoes(alteracoes):
+    if alteracoes is None:
+        atualizar_tabela()  # O diário foi relido do início (substituído por outro processo): recarrega tudo
+        return
+    for id_conta, lancamento in alteracoes:
+        if id_conta in visao:
+            visao.remover(id_conta)
+        if lancamento is not None:
+            visao.adicionar(lancamento)
+    if alteracoes:
+        tabela.atualizar()  # Redesenha só as linhas visíveis
 
 # Função para exibir os integrantes na interface
 def exibir_integrantes():
-    integrantes = carregar_integrantes()  # Carrega a lista de integrantes
-    integrantes_texto = " | ".join(integrantes)  # Junta os nomes dos integrantes com " | " como separador
-    label_integrantes.config(text=f"Integrantes: {integrantes_texto}")  # Atualiza o texto do label com os integrantes
+    def mostrar(integrantes):
+        integrantes_texto = " | ".join(integrantes or ["Nenhum integrante cadastrado"])  # Junta os nomes dos integrantes com " | " como separador
+        label_integrantes.config(text=f"Integrantes: {integrantes_texto}")  # Atualiza o texto do label com os integrantes
+        pagador_combobox.config(values=integrantes)  # Quem pode ter pago a conta
+
+    executor.executar(ler_integrantes_cadastrados, ao_concluir=mostrar, ao_falhar=lambda e: label_integrantes.config(text=f"Erro ao carregar integrantes: {e}"), chave="integrantes")  # Lê o arquivo fora da thread da interface
 
 # Função para salvar as contas no arquivo CSV
 def salvar_contas():
     try:
-        mes_ano = f"{mes_combobox.get()}-{ano_combobox.get()}"  # Obtém o mês e ano selecionados
         conta = conta_combobox.get()  # Obtém o tipo de conta selecionado
         valor = entrada_valor.get()  # Obtém o valor inserido
+        pagador = pagador_combobox.get()  # Quem pagou (opcional: sem pagador, a conta fica fora do acerto)
 
         if not conta or not valor:
             messagebox.showerror("Erro", "Por favor, preencha todos os campos.")  # Exibe um erro se algum campo estiver vazio
             return
 
-        data = pd.to_datetime(mes_ano, format='%m-%Y').strftime('%Y-%m')  # Converte a data para o formato ano-mês
-        nova_linha = pd.DataFrame({'Data': [data], 'Conta': [conta], 'Valor': [float(valor)]})  # Cria um DataFrame com a nova linha
-
-        try:
-            df = pd.read_csv('contas.csv')  # Tenta ler o arquivo CSV existente
-            df = pd.concat([df, nova_linha], ignore_index=True)  # Adiciona a nova linha ao DataFrame existente
-        except FileNotFoundError:
-            df = nova_linha  # Se o arquivo não existir, usa apenas a nova linha
-
-        df.to_csv('contas.csv', index=False)  # Salva o DataFrame atualizado no arquivo CSV
+        data = f"{ano_combobox.get()}-{mes_combobox.get()}"  # Monta a data no formato ano-mês
+        valor = validar_valor(valor)  # Recusa infinito e NaN, que o diário não consegue somar
+    except Exception as e:
+        messagebox.showerror("Erro", f"Erro ao salvar dados: {str(e)}")  # Exibe uma mensagem de erro se algo der errado
+        return
 
-        atualizar_tabela()  # Atualiza a tabela na interface
+    # Depois que a conta for gravada no diário (na thread de trabalho)
+    # A conta já entrou nos índices ordenados e na tabela por aplicar_alteracoes
+    def concluir(id_conta):
         conta_combobox.set('')  # Limpa a seleção da combobox de conta
         entrada_valor.delete(0, tk.END)  # Limpa o campo de entrada de valor
 
         messagebox.showinfo("Sucesso", "Conta salva com sucesso!")  # Exibe uma mensagem de sucesso
-    except Exception as e:
-        messagebox.showerror("Erro", f"Erro ao salvar dados: {str(e)}")  # Exibe uma mensagem de erro se algo der errado
+
+    executar_no_livro(lambda: abrir_livro().inserir(data, conta, valor, pagador), ao_concluir=concluir, ao_falhar=lambda e: messagebox.showerror("Erro", f"Erro ao salvar dados: {str(e)}"))  # Acrescenta a conta ao final do diário
 
 # Função para calcular o preço por integrante
 def calcular_preco_por_integrante():
-    try:
-        df_contas = pd.read_csv('contas.csv')  # Carrega os dados das contas do arquivo CSV
-        integrantes = carregar_integrantes()  # Carrega a lista de integrantes
+    mes_ano = f"{mes_combobox.get()}-{ano_combobox.get()}"  # Obtém o mês e ano selecionados
+    mes = f"{ano_combobox.get()}-{mes_combobox.get()}"  # Mesmo mês no formato ano-mês usado no diário
+
+    # Lê os integrantes e o total do mês na thread de trabalho
+    def ler():
+        indice = abrir_livro().indice  # Totais por mês mantidos pelo diário
+        return carregar_integrantes(), mes in indice.por_mes, indice.total_mes(mes)
+
+    # Mostra o resultado na thread da interface
+    def mostrar(resultado):
+        integrantes, tem_contas, total_contas = resultado
 
         if not integrantes:
             messagebox.showerror("Erro", "Nenhum integrante cadastrado.")  # Exibe um erro se não houver integrantes cadastrados
             return
 
-        mes_ano = f"{mes_combobox.get()}-{ano_combobox.get()}"  # Obtém o mês e ano selecionados
-        df_contas['Data'] = pd.to_datetime(df_contas['Data'], format='%Y-%m')  # Converte a coluna Data para o formato datetime
-        df_filtrada = df_contas[df_contas['Data'].dt.strftime('%m-%Y') == mes_ano]  # Filtra as contas pelo mês e ano selecionados
-
-        if df_filtrada.empty:
+        if not tem_contas:
             messagebox.showerror("Erro", "Nenhuma conta encontrada para o mês e ano selecionados.")  # Exibe um erro se não houver contas para o período selecionado
             return
 
-        total_contas = df_filtrada['Valor'].sum()  # Calcula o total das contas
         preco_por_integrante = total_contas / len(integrantes)  # Calcula o preço por integrante
-        preco_formatado = locale.currency(preco_por_integrante, grouping=True)  # Formata o preço para o formato de moeda brasileira
+        preco_formatado = formatar_brl(preco_por_integrante)  # Formata o preço para o formato de moeda brasileira
 
         messagebox.showinfo("Resultado", f"O preço por integrante para o mês {mes_ano} é: {preco_formatado}")  # Exibe o resultado
-    except Exception as e:
-        messagebox.showerror("Erro", f"Erro ao calcular o preço: {str(e)}")  # Exibe uma mensagem de erro se algo der errado
+
+    executar_no_livro(ler, ao_concluir=mostrar, ao_falhar=lambda e: messagebox.showerror("Erro", f"Erro ao calcular o preço: {str(e)}"))
+
+# Função para mostrar quem deve pagar quanto para quem, considerando todos os meses
+def mostrar_acerto():
+    # Lê os saldos mantidos pelo diário e calcula as transferências na thread de trabalho
+    def ler():
+        from casasplit.divisao import nomes_e_pesos  # Importado só quando necessário
+
+        integrantes, pesos = nomes_e_pesos(ler_linhas('integrantes.csv'))  # Mesmos pesos da divisão em lote
+        livro_aberto = abrir_livro()
+        with livro_aberto.trava:
+            liquidos = livro_aberto.saldos.liquidos(integrantes, pesos=dict(zip(integrantes, pesos)))
+            sem_pagador = livro_aberto.saldos.sem_pagador
+        return integrantes, transferencias(liquidos), sem_pagador
+
+    # Mostra o resultado na thread da interface
+    def mostrar(resultado):
+        integrantes, lista, sem_pagador = resultado
+
+        if not integrantes:
+            messagebox.showerror("Erro", "Nenhum integrante cadastrado.")  # Exibe um erro se não houver integrantes cadastrados
+            return
+
+        linhas = [f"{devedor} paga {formatar_brl(centavos / 100)} para {credor}" for devedor, credor, centavos in lista[:MAXIMO_TRANSFERENCIAS]]
+        if len(lista) > MAXIMO_TRANSFERENCIAS:
+            linhas.append(f"... e mais {len(lista) - MAXIMO_TRANSFERENCIAS} transferências")
+        if not lista:
+            linhas.append("Ninguém deve nada.")
+        if sem_pagador:
+            linhas.append(f"\nContas sem pagador (fora do acerto): {formatar_brl(sem_pagador / 100)}")
+
+        messagebox.showinfo("Acerto de contas", "\n".join(linhas))  # Exibe as transferências
+
+    executar_no_livro(ler, ao_concluir=mostrar, ao_falhar=lambda e: messagebox.showerror("Erro", f"Erro ao calcular o acerto: {str(e)}"))
+
+# Função para montar os valores exibidos de uma linha da tabela (chamada só para as linhas visíveis)
+# Usa as chaves guardadas nos índices, e não o diário, que a thread de trabalho pode estar alterando
+def formatar_linha(id_conta):
+    chaves = visao.chaves(id_conta)
+    valor_formatado = formatar_brl(chaves["Valor"])  # Formata o valor para o formato de moeda brasileira
+    return (chaves["Data"], chaves["Conta"], valor_formatado, chaves["Pagador"])
+
+# Função para ler o diário e montar os índices ordenados (roda na thread de trabalho)
+@medido('contas.carregar_visao')
+def carregar_visao():
+    livro_aberto = abrir_livro()
+    nova_visao = VisaoOrdenada(campos_colunas)
+    with livro_aberto.trava:
+        nova_visao.carregar(list(livro_aberto))  # Copia as contas sem deixar o diário mudar no meio
+        livro_aberto.acompanhar_alteracoes()  # O que mudar depois da cópia chega por aplicar_alteracoes
+    return nova_visao
 
 # Função para atualizar a tabela na interface
 def atualizar_tabela(coluna_ordenar=None):
-    try:
-        df = pd.read_csv('contas.csv')  # Carrega os dados das contas do arquivo CSV
-
-        # Ordena os dados caso uma coluna tenha sido clicada
-        if coluna_ordenar:
-            ordem_colunas[coluna_ordenar] = not ordem_colunas[coluna_ordenar]  # Alterna a ordem de classificação
-            df['Valor'] = df['Valor'].replace(r'[R$\s,]', '', regex=True).astype(float)  # Remove símbolos antes de ordenar
-            df = df.sort_values(by=coluna_ordenar, ascending=ordem_colunas[coluna_ordenar])  # Ordena o DataFrame
+    if coluna_ordenar:
+        # Um cabeçalho foi clicado: só troca o índice exibido, sem ler nem ordenar nada
+        ordem_colunas[coluna_ordenar] = not ordem_colunas[coluna_ordenar]  # Alterna a ordem de classificação
+        visao.ordenar(coluna_ordenar, ordem_colunas[coluna_ordenar])
+        tabela.reiniciar()  # Volta ao topo; só as linhas visíveis são desenhadas
+        return
 
-        for i in tabela.get_children():
-            tabela.delete(i)  # Remove todas as linhas da tabela
+    # Troca o modelo da tabela quando a leitura terminar, mantendo a ordenação escolhida
+    def trocar(nova_visao):
+        global visao
+        nova_visao.ordenar(visao.coluna, visao.crescente)
+        visao = tabela.modelo = nova_visao
+        tabela.reiniciar()  # Volta ao topo; só as linhas visíveis são desenhadas
 
-        for _, row in df.iterrows():
-            valor_formatado = locale.currency(row['Valor'], grouping=True)  # Formata o valor para o formato de moeda brasileira
-            tabela.insert("", "end", values=(row['Data'], row['Conta'], valor_formatado))  # Insere os dados na tabela
-    except FileNotFoundError:
-        pass  # Não faz nada se o arquivo não for encontrado
+    # Pedidos repetidos enquanto a leitura não começou viram uma leitura só
+    executor.executar(carregar_visao, ao_concluir=trocar, ao_falhar=lambda e: messagebox.showerror("Erro", f"Erro ao carregar as contas: {str(e)}"), chave="atualizar_tabela")
 
 # Função para excluir a linha selecionada
 def excluir_linha():
-    selected_item = tabela.selection()  # Obtém a linha selecionada
+    selected_item = tabela.selecionado()  # Obtém a linha selecionada
     if not selected_item:
         messagebox.showerror("Erro", "Selecione uma linha para excluir.")  # Exibe um erro se nenhuma linha estiver selecionada
         return
 
     resposta = messagebox.askyesno("Confirmar Exclusão", "Você tem certeza que deseja excluir esta linha?")  # Confirma a exclusão
     if resposta:
-        item = selected_item[0]
-        valores = tabela.item(item, "values")  # Obtém os valores da linha selecionada
-
-        tabela.delete(item)  # Remove a linha da tabela
-
-        try:
-            df = pd.read_csv('contas.csv')  # Carrega os dados das contas do arquivo CSV
-            df['Valor'] = df['Valor'].replace(r'[R$\s,]', '', regex=True).astype(float)  # Remove símbolos antes de converter
-
-            # Remove a linha correspondente do DataFrame
-            df = df[~((df['Data'] == valores[0]) & (df['Conta'] == valores[1]) & (df['Valor'] == float(valores[2].replace('R$', '').replace('.', '').replace(',', '.'))))]
-
-            df.to_csv('contas.csv', index=False)  # Salva o DataFrame atualizado no arquivo CSV
-        except Exception as e:
-            messagebox.showerror("Erro", f"Erro ao excluir: {str(e)}")  # Exibe uma mensagem de erro se algo der errado
+        item = selected_item  # O iid da linha é o id da conta no diário
+
+        # A conta sai dos índices ordenados e da tabela por aplicar_alteracoes, depois que a lápide for
+        # gravada no diário (ou se outro processo já a tiver excluído)
+        executar_no_livro(lambda: abrir_livro().excluir(item), ao_falhar=lambda e: messagebox.showerror("Erro", f"Erro ao excluir: {str(e)}"))  # Grava a exclusão (lápide) no diário
+
+# Função para indicar que há leitura ou gravação em andamento
+def mostrar_ocupado(ocupado):
+    root = label_status.winfo_toplevel()
+    if ocupado:
+        root.config(cursor="watch")
+        label_status.config(text="⏳ Processando...")
+        barra_progresso.start(15)
+    else:
+        root.config(cursor="")
+        label_status.config(text="")
+        barra_progresso.stop()
 
 # Criar interface gráfica
 def criar_interface():
-    global mes_combobox, ano_combobox, conta_combobox, entrada_valor, tabela, label_integrantes
+    global mes_combobox, ano_combobox, conta_combobox, entrada_valor, pagador_combobox, tabela, label_integrantes, label_status, barra_progresso, executor
 
     root = tk.Tk()  # Cria a janela principal
     root.title("Cadastro de Contas")  # Define o título da janela
-    root.geometry("800x600")  # Define o tamanho inicial da janela
+    root.geometry("800x700")  # Define o tamanho inicial da janela
     root.configure(bg="#f7f7f7")  # Define a cor de fundo da janela
 
+    executor = ExecutorTk(root, ao_mudar_ocupado=mostrar_ocupado)  # Leituras e gravações fora da thread da interface
+
     # Usar o gerenciador de layout grid para tornar a interface responsiva
     root.grid_rowconfigure(0, weight=1)
     root.grid_columnconfigure(0, weight=1)
@@ -158,40 +269,34 @@ def criar_interface():
     ano_combobox.grid(row=1, column=1, padx=5, pady=10, sticky="ew")
 
     tk.Label(frame_entrada, text="Conta:", bg="#ffffff", font=("Helvetica", 12)).grid(row=2, column=0, padx=5, pady=10, sticky="e")
-    conta_combobox = ttk.Combobox(frame_entrada, values=[
-        "Energia", "Água", "Internet", "Telefone Fixo", "Celular", "TV a Cabo", "IPTU",
-        "Aluguel", "Condomínio", "Seguro Residencial", "Gás", "Comida", "Supermercado",
-        "Feira", "Farmácia", "Plano de Saúde", "Academia", "Transporte", "Manutenção do Carro",
-        "Combustível", "Netflix", "Spotify", "Amazon Prime", "Disney+", "HBO Max",
-        "Apple Music", "YouTube Premium", "PlayStation Plus", "Xbox Game Pass", "Steam",
-        "Material de Escritório", "Materiais de Construção", "Móveis", "Eletrodomésticos",
-        "Produtos de Limpeza", "Produtos de Higiene", "Pet Shop", "Veterinário",
-        "Assinatura de Jornal/Revista", "Serviços de Streaming", "Taxa de Lixo",
-        "IPVA", "Seguro do Carro", "Taxa Bancária", "Fatura do Cartão de Crédito",
-        "Empréstimos", "Financiamento Imobiliário", "Financiamento de Veículo"
-    ], 
-    state="readonly", width=30)
+    conta_combobox = ttk.Combobox(frame_entrada, values=TIPOS_CONTA, state="readonly", width=30)
     conta_combobox.grid(row=2, column=1, padx=5, pady=10, sticky="ew")
 
     tk.Label(frame_entrada, text="Valor:", bg="#ffffff", font=("Helvetica", 12)).grid(row=3, column=0, padx=5, pady=10, sticky="e")
     entrada_valor = tk.Entry(frame_entrada, width=20, font=("Helvetica", 12))
     entrada_valor.grid(row=3, column=1, padx=5, pady=10, sticky="ew")
 
+    tk.Label(frame_entrada, text="Pago por:", bg="#ffffff", font=("Helvetica", 12)).grid(row=4, column=0, padx=5, pady=10, sticky="e")
+    pagador_combobox = ttk.Combobox(frame_entrada, values=[], state="readonly", width=30)  # Preenchida quando os integrantes forem lidos
+    pagador_combobox.grid(row=4, column=1, padx=5, pady=10, sticky="ew")
+
     # Cria e posiciona os botões no frame de entrada
     botao_salvar = tk.Button(frame_entrada, text="Salvar Conta", command=salvar_contas, bg="#4CAF50", fg="white", font=("Helvetica", 12, "bold"), width=20)
-    botao_salvar.grid(row=4, column=0, pady=10, padx=5, sticky="ew")
+    botao_salvar.grid(row=5, column=0, pady=10, padx=5, sticky="ew")
 
     botao_deletar = tk.Button(frame_entrada, text="Deletar", command=excluir_linha, bg="#FF5733", fg="white", font=("Helvetica", 12, "bold"), width=20)
-    botao_deletar.grid(row=4, column=1, pady=10, padx=5, sticky="ew")
+    botao_deletar.grid(row=5, column=1, pady=10, padx=5, sticky="ew")
 
     botao_calcular = tk.Button(frame_entrada, text="Conta por integrante", command=calcular_preco_por_integrante, bg="#2196F3", fg="white", font=("Helvetica", 12, "bold"), width=20)
-    botao_calcular.grid(row=4, column=2, pady=10, padx=5, sticky="ew")
+    botao_calcular.grid(row=5, column=2, pady=10, padx=5, sticky="ew")
+
+    botao_acerto = tk.Button(frame_entrada, text="Acerto de contas", command=mostrar_acerto, bg="#9C27B0", fg="white", font=("Helvetica", 12, "bold"), width=20)
+    botao_acerto.grid(row=6, column=0, columnspan=3, pady=10, padx=5, sticky="ew")
 
     frame_integrantes = tk.Frame(root, bg="#ffffff", pady=5, relief=tk.RIDGE, bd=2)  # Cria um frame para exibir os integrantes
     frame_integrantes.grid(row=1, column=0, padx=20, sticky="ew")
     label_integrantes = tk.Label(frame_integrantes, text="Carregando integrantes...", bg="#ffffff", font=("Helvetica", 12, "bold"))
     label_integrantes.pack(pady=5)
-    exibir_integrantes()
 
     frame_tabela = tk.Frame(root, bg="#f7f7f7")  # Cria um frame para a tabela
     frame_tabela.grid(row=2, column=0, padx=20, pady=10, sticky="nsew")
@@ -200,21 +305,39 @@ def criar_interface():
     frame_tabela.grid_columnconfigure(0, weight=1)
 
     # Cria a tabela e define as colunas
-    tabela = ttk.Treeview(frame_tabela, columns=("Data", "Conta", "Valor"), show="headings")
-    tabela.heading("Data", text="Data", command=lambda: atualizar_tabela("Data"))
-    tabela.heading("Conta", text="Conta", command=lambda: atualizar_tabela("Conta"))
-    tabela.heading("Valor", text="Valor", command=lambda: atualizar_tabela("Valor"))
-
-    tabela.column("Data", width=120, anchor="center")
-    tabela.column("Conta", width=200, anchor="center")
-    tabela.column("Valor", width=150, anchor="center")
-
-    tabela.grid(row=0, column=0, sticky="nsew")
-
-    atualizar_tabela()  # Atualiza a tabela com os dados
-
+    tabela = TabelaVirtual(frame_tabela, ("Data", "Conta", "Valor", "Pagador"), visao, formatar_linha)
+    tabela.arvore.heading("Data", text="Data", command=lambda: atualizar_tabela("Data"))
+    tabela.arvore.heading("Conta", text="Conta", command=lambda: atualizar_tabela("Conta"))
+    tabela.arvore.heading("Valor", text="Valor", command=lambda: atualizar_tabela("Valor"))
+    tabela.arvore.heading("Pagador", text="Pago por", command=lambda: atualizar_tabela("Pagador"))
+
+    tabela.arvore.column("Data", width=120, anchor="center")
+    tabela.arvore.column("Conta", width=200, anchor="center")
+    tabela.arvore.column("Valor", width=150, anchor="center")
+    tabela.arvore.column("Pagador", width=150, anchor="center")
+
+    tabela.grid(row=0, column=0)
+
+    frame_status = tk.Frame(root, bg="#f7f7f7")  # Cria um frame para o indicador de processamento
+    frame_status.grid(row=3, column=0, padx=20, pady=(0, 10), sticky="ew")
+    label_status = tk.Label(frame_status, text="", bg="#f7f7f7", font=("Helvetica", 10))
+    label_status.pack(side=tk.LEFT)
+    barra_progresso = ttk.Progressbar(frame_status, mode="indeterminate", length=120)
+    barra_progresso.pack(side=tk.RIGHT)
+
+    exibir_integrantes()  # Lê os integrantes em segundo plano
+    atualizar_tabela()  # Atualiza a tabela com os dados (lidos em segundo plano)
+
+    avisar_janela_pronta(root)  # Só faz algo quando o benchmark de inicialização está medindo
     root.mainloop()  # Inicia o loop principal da interface gráfica
 
+    executor.encerrar()  # Espera as gravações pendentes terminarem
+    abrir_livro().aguardar_compactacao()  # Espera uma compactação em segundo plano terminar
+    abrir_livro().exportar_csv()  # Ao fechar, exporta as contas para o contas.csv no formato Data,Conta,Valor,Pagador
+    from casasplit.instantaneo import ARQUIVO_INSTANTANEO, instantaneo_disponivel, salvar_instantaneo  # Importado só ao fechar
+    if os.path.exists(ARQUIVO_INSTANTANEO) and instantaneo_disponivel():
+        salvar_instantaneo()  # Se o instantâneo Parquet estiver em uso, deixa-o em dia com o diário
+
 # Iniciar a interface gráfica se este script for executado diretamente
 if __name__ == "__main__":
     criar_interface()
\ No newline at end of file
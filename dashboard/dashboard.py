@@ -1,58 +1,139 @@
 # Importação das bibliotecas necessárias
 import streamlit as st  # Biblioteca para criar aplicativos web interativos
 import pandas as pd  # Biblioteca para manipulação de dados em formato de tabela (DataFrame)
-import matplotlib.pyplot as plt  # Biblioteca para criação de gráficos
-import seaborn as sns  # Biblioteca para visualização de dados baseada no Matplotlib
-import locale  # Biblioteca para configuração de localidade (idioma, formato de números, datas, etc.)
+import os  # Para localizar a pasta raiz do projeto
+import sys  # Para permitir importar o pacote casasplit
+from contextlib import nullcontext  # O instantâneo não muda enquanto é lido, então dispensa trava
 
-# Configurar o locale para o Brasil
-locale.setlocale(locale.LC_ALL, 'pt_BR.UTF-8')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))  # Permite importar o pacote da raiz do projeto
+from casasplit.acerto import transferencias  # Transferências que zeram os saldos do acerto de contas
+from casasplit.csv_simples import ler_coluna, ler_linhas  # Leitura de CSV só com a biblioteca padrão
+from casasplit.divisao import nomes_e_pesos  # Pesos da coluna opcional Peso, como na divisão em lote
+from casasplit.formatacao import formatar_brl, formatar_brl_vetor  # Formatação em reais sem depender do locale do sistema
+from casasplit import graficos  # Gráficos em cache (matplotlib só é importado se for desenhar) ou nativos do Streamlit
+from casasplit.instantaneo import (  # Instantâneo Parquet opcional para históricos grandes
+    ARQUIVO_INSTANTANEO, ResumoInstantaneo, carregar_instantaneo, instantaneo_atualizado, instantaneo_disponivel,
+)
+from casasplit.livro import abrir_livro, assinatura_arquivo  # Diário das contas
+from casasplit import medicao  # Medição de tempo das etapas (painel de desempenho)
 
-# Função para carregar os dados corretamente
-def carregar_dados():
-    try:
-        df = pd.read_csv('contas.csv')  # Carrega os dados do arquivo CSV
-        df['Data'] = pd.to_datetime(df['Data']).dt.strftime('%Y-%m')  # Converte a coluna 'Data' para o formato ano-mês
-        df['Valor'] = df['Valor'].astype(str).str.replace(',', '.').astype(float)  # Converte a coluna 'Valor' para float
-        return df
-    except FileNotFoundError:
-        return pd.DataFrame(columns=['Data', 'Conta', 'Valor'])  # Retorna um DataFrame vazio se o arquivo não for encontrado
-
-# Função para carregar os integrantes
-def carregar_integrantes():
-    try:
-        df_integrantes = pd.read_csv('integrantes.csv')  # Carrega os dados do arquivo CSV
-        return df_integrantes['Integrantes'].tolist()  # Retorna a lista de integrantes
-    except FileNotFoundError:
-        return []  # Retorna uma lista vazia se o arquivo não for encontrado
+# Os caches abaixo sobrevivem às reexecuções do script; a chave é a versão do diário (ou a assinatura
+# do arquivo), então um clique nos filtros reaproveita tudo e só uma alteração nos dados recalcula.
+
+# Função para carregar os dados corretamente (uma vez por versão do diário)
+# A versão só aumenta, então uma versão antiga nunca volta a ser pedida: guarda só a cópia atual do diário
+@st.cache_resource(max_entries=1, show_spinner=False)
+@medicao.medido('dashboard.carregar_dados')
+def carregar_dados(_livro, versao):
+    df = _livro.para_dataframe()  # Monta o DataFrame a partir das contas já lidas pelo diário
+    with medicao.medir('dashboard.datas'):
+        df['Data'] = df['Data'].str[:7]  # Mantém só o ano-mês, como no índice de agregados
+    return df
+
+# Função para filtrar as contas de um mês (memoizada por versão e mês)
+@st.cache_resource(max_entries=32, show_spinner=False)
+@medicao.medido('dashboard.filtrar_mes')
+def filtrar_mes(_df, versao, mes):
+    return _df[_df['Data'] == mes]
+
+# Função para ler os agregados do instantâneo (uma vez por versão do arquivo)
+@st.cache_resource(max_entries=2, show_spinner=False)
+def carregar_resumo(assinatura):
+    return ResumoInstantaneo(ARQUIVO_INSTANTANEO)
+
+# Função para ler do instantâneo só as contas de um mês (filtro aplicado na leitura do arquivo)
+@st.cache_resource(max_entries=32, show_spinner=False)
+def carregar_mes(assinatura, mes):
+    return carregar_instantaneo(ARQUIVO_INSTANTANEO, mes=mes)
+
+# Função para montar a tabela de tendência (total por mês)
+@st.cache_resource(max_entries=4, show_spinner=False)
+@medicao.medido('dashboard.agregar_tendencia')
+def montar_tendencia(_indice, versao):
+    return pd.DataFrame(_indice.tendencia(), columns=['Data', 'Valor'])
+
+# Função para montar a tabela de gastos por categoria
+@st.cache_resource(max_entries=4, show_spinner=False)
+@medicao.medido('dashboard.agregar_categorias')
+def montar_categorias(_indice, versao):
+    return pd.DataFrame(sorted(_indice.categorias().items()), columns=['Conta', 'Valor'])
+
+# Função para calcular as transferências do acerto de contas (mes=None: todos os meses)
+@st.cache_resource(max_entries=8, show_spinner=False)
+@medicao.medido('dashboard.acerto')
+def montar_acerto(_saldos, versao, integrantes, pesos, mes):
+    lista = transferencias(_saldos.liquidos(list(integrantes), mes, dict(zip(integrantes, pesos))))
+    return pd.DataFrame(lista, columns=['De', 'Para', 'Centavos'])
+
+# Função para carregar os integrantes (relê o arquivo só quando a assinatura muda)
+@st.cache_data(max_entries=4, show_spinner=False)
+def carregar_integrantes(assinatura):
+    return ler_coluna('integrantes.csv', 'Integrantes')  # Retorna a lista de integrantes (vazia se o arquivo não existir)
+
+# Função para carregar os pesos dos integrantes (1 para todos se não houver a coluna Peso)
+@st.cache_data(max_entries=4, show_spinner=False)
+def carregar_pesos(assinatura):
+    return nomes_e_pesos(ler_linhas('integrantes.csv'))[1]
 
 # Função para formatar valores em BRL sem erro
 def formatar_valor(valor):
-    return locale.currency(valor, grouping=True)  # Formata o valor para o formato de moeda brasileira
+    return formatar_brl(valor)  # Formata o valor para o formato de moeda brasileira
+
+# Painel de desempenho: quando ligado, mede as etapas desta execução e guarda as durações na sessão
+# (a medição vale só para a thread desta sessão; as outras sessões não são afetadas)
+painel_desempenho = st.session_state.get('painel_desempenho', False)  # Valor do botão desenhado no fim da página
+if painel_desempenho:
+    medicao.ativar_na_thread()
+else:
+    medicao.desativar_na_thread()  # Se a variável de ambiente pedir a medição, ela continua valendo
+coletor = st.session_state.setdefault('coletor_desempenho', medicao.Coletor())
+medicao.usar_coletor(coletor if painel_desempenho else None)
 
-# Carregar dados
-df = carregar_dados()
-integrantes = carregar_integrantes()
+# Carregar dados: usa o instantâneo Parquet quando ele estiver em dia com o diário (lendo só o mês
+# exibido); senão, o próprio diário
+usar_instantaneo = instantaneo_disponivel() and instantaneo_atualizado()
+if usar_instantaneo:
+    versao = assinatura_arquivo(ARQUIVO_INSTANTANEO)  # Chave dos caches de dados derivados
+    indice = carregar_resumo(versao)  # Totais por mês e categoria calculados a partir do instantâneo
+    saldos = indice.saldos  # Quanto cada pessoa pagou, lido do instantâneo
+    trava = nullcontext()
+else:
+    livro = abrir_livro()  # Lê apenas o que foi acrescentado ao diário desde a última execução
+    versao = livro.versao  # Chave dos caches de dados derivados
+    df = carregar_dados(livro, versao)
+    indice = livro.indice  # Totais por mês e categoria mantidos pelo diário
+    saldos = livro.saldos  # Quanto cada pessoa pagou, mantido pelo diário
+    trava = livro.trava  # Outras sessões podem atualizar o diário enquanto o índice e os saldos são lidos
+with trava:
+    meses_disponiveis = indice.meses()  # Obtém os meses disponíveis nos dados, em ordem
+sem_dados = not meses_disponiveis  # Nenhuma conta cadastrada
+integrantes = carregar_integrantes(assinatura_arquivo('integrantes.csv'))
 
 # Criar interface Streamlit
 st.set_page_config(page_title="Dashboard de Gastos", page_icon="💰", layout="wide")  # Configura a página do Streamlit
 st.title('💰 Dashboard de Gastos')  # Define o título da página
+if not usar_instantaneo and livro.invalidas:
+    st.warning(f"{livro.invalidas} linha(s) do diário com valor inválido foram ignoradas.")  # O resto do diário continua valendo
 
 # Sidebar para seleção do mês e ano
 st.sidebar.header("📅 Filtros")  # Adiciona um cabeçalho na barra lateral
-if not df.empty:
-    meses_disponiveis = df['Data'].unique()  # Obtém os meses disponíveis nos dados
+if not sem_dados:
     mes_selecionado = st.sidebar.selectbox("Selecione o mês e ano:", meses_disponiveis, index=len(meses_disponiveis)-1)  # Cria uma caixa de seleção para os meses
 else:
     mes_selecionado = None
+graficos_nativos = st.sidebar.toggle("Gráficos leves (nativos do Streamlit)", value=False)  # Dispensa o matplotlib
 
 # Calcular e mostrar valor por integrante
 st.subheader('👥 Valor por Integrante')  # Subcabeçalho na página principal
-if mes_selecionado and not df.empty:
-    df_filtrado = df[df['Data'] == mes_selecionado]  # Filtra os dados pelo mês selecionado
+if mes_selecionado and not sem_dados:
+    if usar_instantaneo:
+        df_filtrado = carregar_mes(versao, mes_selecionado)  # Lê do instantâneo só o mês selecionado
+    else:
+        df_filtrado = filtrar_mes(df, versao, mes_selecionado)  # Filtra os dados pelo mês selecionado
     
     if not df_filtrado.empty and integrantes:
-        total_gastos = df_filtrado['Valor'].sum()  # Calcula o total de gastos no mês selecionado
+        with trava:
+            total_gastos = indice.total_mes(mes_selecionado)  # Lê o total de gastos do mês selecionado no índice
         valor_por_integrante = total_gastos / len(integrantes)  # Calcula o valor por integrante
         valor_formatado = formatar_valor(valor_por_integrante)  # Formata o valor para moeda brasileira
 
@@ -73,20 +154,50 @@ else:
 
 # Mostrar tabela de gastos
 st.subheader('📜 Tabela de Gastos')  # Subcabeçalho na página principal
-if mes_selecionado and not df.empty:
+if mes_selecionado and not sem_dados:
     df_exibir = df_filtrado.copy()
-    df_exibir['Valor'] = df_exibir['Valor'].apply(formatar_valor)  # Formata os valores para exibição
+    df_exibir['Valor'] = formatar_brl_vetor(df_exibir['Valor'])  # Formata a coluna inteira de uma vez para exibição
     st.dataframe(df_exibir, hide_index=True)  # Exibe a tabela de gastos
 else:
     st.write("Nenhuma conta cadastrada ou selecione um mês e ano.")  # Mensagem de erro
 
+# Acerto de contas: quem paga quanto para quem, com o menor número de transferências
+st.subheader('🤝 Acerto de Contas')  # Subcabeçalho na página principal
+if not sem_dados and integrantes:
+    try:
+        pesos = carregar_pesos(assinatura_arquivo('integrantes.csv'))  # Só o acerto depende dos pesos
+    except ValueError as erro:
+        pesos = None
+        st.error(f"❌ Não foi possível calcular o acerto: {erro}.")  # O resto da página continua valendo
+
+    if pesos is not None:
+        periodo = st.radio("Período do acerto:", ["Mês selecionado", "Todos os meses"], horizontal=True)
+        mes_acerto = mes_selecionado if periodo == "Mês selecionado" else None
+        with trava:
+            df_acerto = montar_acerto(saldos, versao, tuple(integrantes), tuple(pesos), mes_acerto)
+            com_pagador = saldos.total if mes_acerto is None else saldos.total_mes[mes_acerto]
+
+        if not df_acerto.empty:
+            df_exibir = df_acerto[['De', 'Para']].copy()
+            df_exibir['Valor'] = formatar_brl_vetor(df_acerto['Centavos'] / 100)
+            st.dataframe(df_exibir, hide_index=True)  # Exibe as transferências
+        elif com_pagador:
+            st.write("✅ Ninguém deve nada neste período.")
+        else:
+            st.write("Nenhuma conta com pagador informado.")  # As contas antigas não têm pagador
+        if saldos.sem_pagador:
+            st.caption(f"Contas sem pagador ficam fora do acerto: {formatar_valor(saldos.sem_pagador / 100)} no total.")
+else:
+    st.write("Nenhuma conta ou integrante cadastrado para o acerto.")  # Mensagem de erro
+
 # Indicadores de Performance
 st.subheader('📊 Indicadores de Performance')  # Subcabeçalho na página principal
-if not df.empty:
-    total_gastos = df['Valor'].sum()  # Calcula o total de gastos
-    media_gastos = df['Valor'].mean()  # Calcula a média de gastos
-    max_gasto = df['Valor'].max()  # Calcula o maior gasto
-    min_gasto = df['Valor'].min()  # Calcula o menor gasto
+if not sem_dados:
+    with trava:  # mínimo e máximo descartam do heap os valores excluídos
+        total_gastos = indice.geral.soma  # Total de gastos
+        media_gastos = indice.geral.media  # Média de gastos
+        max_gasto = indice.geral.maximo  # Maior gasto
+        min_gasto = indice.geral.minimo  # Menor gasto
 
     col1, col2, col3, col4 = st.columns(4)  # Cria quatro colunas para os indicadores
     col1.metric("💵 Total de Gastos", formatar_valor(total_gastos))  # Exibe o total de gastos
@@ -98,53 +209,57 @@ else:
 
 # Gráfico de tendência
 st.subheader('📈 Tendência de Gastos')  # Subcabeçalho na página principal
-if not df.empty:
-    df_tendencia = df.groupby('Data')['Valor'].sum().reset_index()  # Agrupa os dados por data e soma os valores
+if not sem_dados:
+    with trava:
+        df_tendencia = montar_tendencia(indice, versao)  # Total de cada mês, lido do índice
+    meses, totais = df_tendencia['Data'].tolist(), df_tendencia['Valor'].tolist()
 
-    fig, ax = plt.subplots(figsize=(8, 5))  # Cria um gráfico
-    ax.plot(df_tendencia['Data'], df_tendencia['Valor'], marker='o', linestyle='-', color='#1E3A8A', linewidth=2)  # Plota a linha de tendência
-    ax.set_title('Tendência de Gastos ao Longo do Tempo', fontsize=16, weight='bold', color='#4B5563')
-    ax.set_xlabel('Data (Ano-Mês)', fontsize=12, color='#6B7280')
-    ax.set_ylabel('Gastos em BRL', fontsize=12, color='#6B7280')
-    ax.grid(True, axis='y', linestyle='--', alpha=0.7, color='#D1D5DB')
-    plt.xticks(rotation=45)
-
-    # Adicionar rótulos aos pontos
-    for i, row in df_tendencia.iterrows():
-        ax.text(row['Data'], row['Valor'], formatar_valor(row['Valor']), ha='center', va='bottom', fontsize=10, color='#1F2937')
-
-    # Estilo
-    plt.tight_layout()
-
-    st.pyplot(fig)  # Exibe o gráfico
+    # Muitos meses são somados por trimestre ou ano; a imagem só é desenhada se os totais mudarem
+    if graficos_nativos:
+        st.vega_lite_chart(graficos.especificacao_tendencia(meses, totais))
+    else:
+        st.image(graficos.grafico_tendencia(meses, totais))  # Exibe o gráfico
 else:
     st.write("Nenhum dado disponível para o gráfico.")  # Mensagem de erro
 
 # Gráfico de Barras para Gastos por Categoria
 st.subheader('📊 Gastos por Categoria')  # Subcabeçalho na página principal
-if not df.empty:
-    df_categoria = df.groupby('Conta')['Valor'].sum().reset_index()  # Agrupa os dados por categoria e soma os valores
+if not sem_dados:
+    with trava:
+        df_categoria = montar_categorias(indice, versao)  # Total de cada categoria, lido do índice
+    contas, totais = df_categoria['Conta'].tolist(), df_categoria['Valor'].tolist()
 
-    fig, ax = plt.subplots(figsize=(8, 5))  # Cria um gráfico de barras
-    sns.barplot(x='Valor', y='Conta', data=df_categoria, palette='viridis', ax=ax)  # Plota as barras
-    ax.set_title('Gastos por Categoria', fontsize=16, weight='bold', color='#4B5563')
-    ax.set_xlabel('Gastos em BRL', fontsize=12, color='#6B7280')
-    ax.set_ylabel('Categoria', fontsize=12, color='#6B7280')
-    ax.grid(True, axis='x', linestyle='--', alpha=0.7, color='#D1D5DB')
-
-    st.pyplot(fig)  # Exibe o gráfico
+    if graficos_nativos:
+        st.vega_lite_chart(graficos.especificacao_categorias(contas, totais))
+    else:
+        st.image(graficos.grafico_categorias(contas, totais))  # Exibe o gráfico
 else:
     st.write("Nenhum dado disponível para o gráfico.")  # Mensagem de erro
 
 # Gráfico de Pizza para Distribuição de Gastos
 st.subheader('🍰 Distribuição de Gastos')  # Subcabeçalho na página principal
-if not df.empty:
-    df_pizza = df.groupby('Conta')['Valor'].sum().reset_index()  # Agrupa os dados por categoria e soma os valores
-
-    fig, ax = plt.subplots(figsize=(8, 5))  # Cria um gráfico de pizza
-    ax.pie(df_pizza['Valor'], labels=df_pizza['Conta'], autopct='%1.1f%%', startangle=140, colors=sns.color_palette('viridis', len(df_pizza)))  # Plota a pizza
-    ax.set_title('Distribuição de Gastos por Categoria', fontsize=16, weight='bold', color='#4B5563')
-
-    st.pyplot(fig)  # Exibe o gráfico
+if not sem_dados:
+    # Mesmos totais por categoria do gráfico de barras
+    if graficos_nativos:
+        st.vega_lite_chart(graficos.especificacao_pizza(contas, totais))
+    else:
+        st.image(graficos.grafico_pizza(contas, totais))  # Exibe o gráfico
 else:
-    st.write("Nenhum dado disponível para o gráfico.")  # Mensagem de erro
\ No newline at end of file
+    st.write("Nenhum dado disponível para o gráfico.")  # Mensagem de erro
+
+# Painel de desempenho na barra lateral: percentis de cada etapa medida nesta sessão
+st.sidebar.header("⏱️ Desempenho")
+if st.sidebar.toggle("Medir etapas desta sessão", key='painel_desempenho'):
+    if st.sidebar.button("Limpar medições"):
+        coletor.limpar()
+    resumo = coletor.percentis()
+    if resumo:
+        st.sidebar.dataframe(
+            pd.DataFrame(
+                [(etapa, quantidade, p50, p90, p99) for etapa, (quantidade, p50, p90, p99) in resumo.items()],
+                columns=['Etapa', 'N', 'p50 (ms)', 'p90 (ms)', 'p99 (ms)'],
+            ).round(2),
+            hide_index=True,
+        )
+    else:
+        st.sidebar.write("Nenhuma etapa medida ainda; interaja com a página para coletar tempos.")
\ No newline at end of file
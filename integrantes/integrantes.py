@@ -1,8 +1,16 @@
 # Importação das bibliotecas necessárias
-import pandas as pd  # Biblioteca pandas para manipulação de dados em formato de tabela (DataFrame)
+import os  # Para localizar a pasta raiz do projeto
+import sys  # Para permitir importar o pacote casasplit
 import tkinter as tk  # Biblioteca tkinter para criar interfaces gráficas
 from tkinter import messagebox  # Para exibir caixas de mensagem
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))  # Permite importar o pacote da raiz do projeto
+from casasplit.csv_simples import ler_linhas, salvar_coluna, salvar_colunas  # CSV só com a biblioteca padrão (sem o pandas, a janela abre mais rápido)
+from casasplit.inicio import avisar_janela_pronta  # Usado pelo benchmark de inicialização
+from casasplit.tarefas import ExecutorTk  # Executa a gravação fora da thread da interface
+
+executor = None  # Executa a gravação do arquivo fora da thread da interface
+
 # Função que será chamada para salvar os dados no formato CSV
 def salvar_csv():
     arquivo_csv = "integrantes.csv"  # Nome do arquivo CSV a ser gerado
@@ -13,23 +21,38 @@ def salvar_csv():
     # Separar os nomes, remover espaços em branco extras e criar uma lista de integrantes
     integrantes = [nome.strip() for nome in integrantes.split(',')]  # Divide o texto pelo separador vírgula e limpa espaços extras
     
-    # Criar um DataFrame usando o pandas, onde cada nome será uma linha na coluna 'Integrantes'
-    df = pd.DataFrame({'Integrantes': integrantes})
-    
-    # Salvar o DataFrame no arquivo CSV, sem incluir o índice na primeira coluna
-    df.to_csv(arquivo_csv, index=False)
-    
-    # Exibir uma mensagem de sucesso ao usuário
-    messagebox.showinfo("Sucesso", f"Arquivo '{arquivo_csv}' criado com sucesso!")
+    # Gravar o arquivo na thread de trabalho, para a janela continuar respondendo
+    def gravar():
+        # Mantém os pesos já cadastrados na coluna opcional 'Peso' (quem é novo entra com peso 1)
+        pesos = {linha['Integrantes']: linha['Peso'] for linha in ler_linhas(arquivo_csv) if linha.get('Peso')}
+        if pesos:
+            salvar_colunas(arquivo_csv, ['Integrantes', 'Peso'], [[nome, pesos.get(nome, 1)] for nome in integrantes])
+        else:
+            # Salvar o arquivo CSV, onde cada nome será uma linha na coluna 'Integrantes'
+            salvar_coluna(arquivo_csv, 'Integrantes', integrantes)
+
+    # Exibir uma mensagem de sucesso (ou de erro) ao usuário quando a gravação terminar
+    executor.executar(
+        gravar,
+        ao_concluir=lambda _: messagebox.showinfo("Sucesso", f"Arquivo '{arquivo_csv}' criado com sucesso!"),
+        ao_falhar=lambda e: messagebox.showerror("Erro", f"Erro ao salvar o arquivo: {str(e)}"),
+    )
+
+# Função para indicar que a gravação está em andamento
+def mostrar_ocupado(ocupado):
+    botao.config(state=tk.DISABLED if ocupado else tk.NORMAL, text="Salvando..." if ocupado else "Salvar")
+    botao.winfo_toplevel().config(cursor="watch" if ocupado else "")
 
 # Função para criar a interface gráfica
 def criar_interface():
-    global entrada  # Declarando a variável de entrada como global para ser acessada em outras funções
+    global entrada, botao, executor  # Declarando as variáveis como globais para serem acessadas em outras funções
     
     root = tk.Tk()  # Criação da janela principal da interface gráfica
     root.title("Cadastro de Integrantes da Casa")  # Definindo o título da janela
     root.geometry("600x250")  # Definindo o tamanho da janela (largura x altura)
     root.configure(bg="#f5f5f5")  # Definindo a cor de fundo da janela
+
+    executor = ExecutorTk(root, ao_mudar_ocupado=mostrar_ocupado)  # Gravações fora da thread da interface
     
     # Criar um frame dentro da janela principal para organizar os widgets (botões, labels, etc)
     frame = tk.Frame(root, bg="#ffffff", padx=20, pady=20, relief=tk.GROOVE, bd=2)
@@ -46,8 +69,11 @@ def criar_interface():
     botao = tk.Button(frame, text="Salvar", command=salvar_csv, bg="#007BFF", fg="white", font=("Helvetica", 12, "bold"), padx=20, pady=10, relief=tk.FLAT)
     botao.pack(pady=10)  # Adiciona o botão ao frame com espaçamento vertical
     
+    avisar_janela_pronta(root)  # Só faz algo quando o benchmark de inicialização está medindo
     root.mainloop()  # Inicia o loop principal da interface gráfica, fazendo a janela ficar ativa
 
+    executor.encerrar()  # Espera uma gravação pendente terminar
+
 # Checar se o script está sendo executado diretamente
 if __name__ == "__main__":  # Verifica se o script está sendo executado como o programa principal
     criar_interface()  # Chama a função que cria a interface gráfica
\ No newline at end of file
@@ -0,0 +1,89 @@
+# Testes do diário das contas
+#
+# Uso: python -m unittest discover tests
+import os  # Para montar os caminhos
+import sys  # Para permitir importar o pacote casasplit
+import tempfile  # Pasta temporária para cada teste
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))  # Permite importar o pacote da raiz do projeto
+from casasplit.livro import ARQUIVO_CSV, ARQUIVO_DIARIO, Livro
+
+
+class TesteSubstituicao(unittest.TestCase):
+    def setUp(self):
+        pasta = tempfile.TemporaryDirectory()
+        self.addCleanup(pasta.cleanup)
+        self.caminho = os.path.join(pasta.name, ARQUIVO_DIARIO)
+        self.caminho_csv = os.path.join(pasta.name, ARQUIVO_CSV)
+
+    # Função para abrir um livro independente (como outro processo faria) no mesmo diário
+    def abrir(self):
+        return Livro(self.caminho, self.caminho_csv)
+
+    # Duas compactações seguidas podem devolver o inode do primeiro diário (A -> B -> A no ext4); o
+    # leitor precisa perceber a troca em vez de continuar lendo da posição antiga
+    def test_leitor_percebe_duas_compactacoes(self):
+        escritor = self.abrir()
+        ids = [escritor.inserir('2024-01-01', 'Luz', 1.0) for _ in range(4)]
+        leitor = self.abrir()
+        for id_conta in ids[:3]:
+            escritor.excluir(id_conta)
+        escritor.compactar()
+        escritor.compactar()
+        for _ in range(20):
+            escritor.inserir('2024-01-01', 'Luz', 2.0)
+
+        leitor.sincronizar()
+        self.assertEqual(set(leitor.lancamentos), set(escritor.lancamentos))
+        self.assertEqual(sum(l.valor for l in leitor), 41.0)
+
+    # Cada compactação gera um diário com identidade nova, mesmo que o inode se repita
+    def test_compactacao_muda_identidade(self):
+        livro = self.abrir()
+        livro.inserir('2024-01-01', 'Luz', 1.0)
+        identidades = [livro.identidade]
+        for _ in range(3):
+            livro.compactar()
+            identidades.append(livro.identidade)
+        self.assertEqual(len(set(identidades)), len(identidades))
+
+        leitor = self.abrir()
+        self.assertEqual(leitor.identidade, livro.identidade)
+
+
+
+class TesteValores(unittest.TestCase):
+    def setUp(self):
+        pasta = tempfile.TemporaryDirectory()
+        self.addCleanup(pasta.cleanup)
+        self.caminho = os.path.join(pasta.name, ARQUIVO_DIARIO)
+        self.caminho_csv = os.path.join(pasta.name, ARQUIVO_CSV)
+
+    # Infinito e NaN não podem chegar ao diário
+    def test_inserir_recusa_valor_nao_finito(self):
+        livro = Livro(self.caminho, self.caminho_csv)
+        for valor in ('inf', '-inf', 'nan', 1e300):
+            with self.assertRaises(ValueError):
+                livro.inserir('2024-01-01', 'Luz', valor)
+        self.assertEqual(len(livro), 0)
+
+    # Uma linha inválida já gravada fica de fora, sem impedir a leitura do resto do diário
+    def test_linha_invalida_e_ignorada(self):
+        livro = Livro(self.caminho, self.caminho_csv)
+        livro.inserir('2024-01-01', 'Luz', 10.0)
+        with open(self.caminho, 'a', newline='', encoding='utf-8') as arquivo:
+            arquivo.write('abc,I,2024-01-02,Luz,inf,,\n')
+        livro.inserir('2024-01-03', 'Água', 5.0)
+
+        for leitor in (livro, Livro(self.caminho, self.caminho_csv)):
+            self.assertEqual(leitor.invalidas, 1)
+            self.assertEqual(sorted(l.valor for l in leitor), [5.0, 10.0])
+            self.assertEqual(leitor.indice.geral.soma, 15.0)
+
+        livro.compactar()
+        self.assertEqual(Livro(self.caminho, self.caminho_csv).invalidas, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()